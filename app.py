@@ -2,51 +2,1124 @@
 # Soham Naik, Michael Asman, Dilraj Dhillon
 # Check /references for the original code -> Ported into this file for ease of assembly.
 # This script is a GUI application for fetching and visualizing stock data using yfinance.
+# `python app.py --batch ...` runs the same fetch -> indicators -> export pipeline headless.
 
 import os
+import re
+import sys
+import tempfile
+import argparse
+import base64
+import importlib
 import json
+import time
+import zipfile
+import queue
+import random
+import threading
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
-import tkinter as tk
-from tkinter import ttk, messagebox
-from tkcalendar import DateEntry
-import yfinance as yf
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+class _LazyModule:
+    # Stands in for a module and imports it on first attribute access, so headless runs
+    # (the --batch CLI and its worker processes) never load Tk and the window can open
+    # before pandas, matplotlib and yfinance are loaded. Once imported, the real module
+    # replaces the stand-in under its global name, so hot paths pay no extra lookup
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+            globals()[self._alias] = self._module
+        return getattr(self._module, attr)
+
+
+yf = _LazyModule('yfinance', 'yf')
+np = _LazyModule('numpy', 'np')
+pd = _LazyModule('pandas', 'pd')
+plt = _LazyModule('matplotlib.pyplot', 'plt')
+mdates = _LazyModule('matplotlib.dates', 'mdates')
+mcollections = _LazyModule('matplotlib.collections', 'mcollections')
+mlines = _LazyModule('matplotlib.lines', 'mlines')
+mcolors = _LazyModule('matplotlib.colors', 'mcolors')
+tk = _LazyModule('tkinter', 'tk')
+ttk = _LazyModule('tkinter.ttk', 'ttk')
+messagebox = _LazyModule('tkinter.messagebox', 'messagebox')
+tkcalendar = _LazyModule('tkcalendar', 'tkcalendar')
+backend_tkagg = _LazyModule('matplotlib.backends.backend_tkagg', 'backend_tkagg')
+# Imported off the Tk thread right after the window opens, so the first fetch finds them loaded
+WARM_MODULES = (np, pd, mdates, plt, yf)
 
 # Constants for date limits and available metrics
 MIN_DATE = date(2000, 1, 1)
 TODAY = datetime.today().date()
 MIN_SPAN_DAYS = 7
 METRICS = ['Close', 'SMA', 'EMA', 'Volatility', 'Volume']
+# Columns persisted by the history cache: raw bars plus the indicators derived from them
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+INDICATOR_COLUMNS = ['SMA', 'EMA', 'Volatility']
+INDICATOR_WINDOW = 20
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+# In-memory datasets: columns kept per ticker, byte budget before LRU eviction, and how long
+# a loaded ticker is reused by a new fetch before it is refreshed from the cache/provider
+DATASET_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume'] + INDICATOR_COLUMNS
+MEMORY_BUDGET = 256 * 2 ** 20
+DATASET_MAX_AGE = 15 * 60
+# Fundamentals cache: seconds each INFO field stays fresh, and how many tickers are kept
+HOUR = 3600
+DAY = 24 * HOUR
+INFO_TTLS = {
+    'longName': 30 * DAY, 'sector': 30 * DAY, 'industry': 30 * DAY, 'website': 30 * DAY,
+    'address1': 30 * DAY, 'city': 30 * DAY, 'beta': 7 * DAY, 'trailingEps': DAY,
+    'dividendYield': DAY, 'marketCap': 6 * HOUR, 'trailingPE': 6 * HOUR,
+}
+INFO_CACHE_SIZE = 500
+# Network fan-out: total worker threads, concurrent calls per provider host, retries
+FETCH_WORKERS = 8
+MAX_PER_HOST = 4
+FETCH_RETRIES = 3
+RETRY_BACKOFF = 0.5
+# How often the GUI drains results posted by the background fetch
+POLL_MS = 50
+# Redraw requests arriving within this many ms are coalesced into one render (about a frame)
+REDRAW_MS = 16
+# Export formats written by DataExporter, their file extensions, and rows per write
+DATA_FORMATS = ['CSV', 'Excel', 'JSON', 'Parquet', 'Feather', 'NPZ']
+EXPORT_EXTENSIONS = {'CSV': 'csv', 'Excel': 'xlsx', 'JSON': 'json', 'Parquet': 'parquet',
+                     'Feather': 'feather', 'NPZ': 'npz', 'PNG': 'png', 'PDF': 'pdf',
+                     'Trace': 'trace.json', 'HTML': 'html'}
+EXPORT_CHUNK_ROWS = 50_000
+# HTML dashboard hover number format per y axis: price, volatility, volume
+HOVER_FORMATS = {'y': '.2f', 'y2': '.4f', 'y3': ',.0f'}
+# Plotted points per pixel of axes width, and how many decimated series to keep
+POINTS_PER_PIXEL = 2
+# COMPARE tab: default rolling window (bars), cached comparisons, and the ticker counts
+# above which the legend and the correlation tick labels are left off
+COMPARE_WINDOW = 60
+COMPARE_CACHE_SIZE = 16
+COMPARE_LEGEND_MAX = 12
+COMPARE_LABEL_MAX = 30
+# Coarser bar levels kept per ticker for long ranges (finest first), and their chart labels
+LOD_LEVELS = ['W', 'M', 'Q']
+LOD_NAMES = {'D': 'daily', 'W': 'weekly', 'M': 'monthly', 'Q': 'quarterly'}
+DECIMATE_CACHE_SIZE = 128
+# Live mode: poll interval, minute bars kept per ticker (about five sessions), buffered columns
+LIVE_POLL_MS = 60_000
+LIVE_CAPACITY = 5 * 390
+LIVE_COLUMNS = ['x', 'Close', 'Volume', 'SMA', 'EMA', 'Volatility']
+# Timing spans kept for the PERF tab and trace dumps (oldest dropped first)
+TRACE_CAPACITY = 20_000
+
+
+class _NullSpan:
+    # What Tracer.span hands out while recording is off: entering, leaving and tagging do nothing
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def tag(self, **tags):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    # One timed region; tags added while it is open end up in the trace event's args
+    def __init__(self, tracer, name, tags):
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.tags['error'] = exc_type.__name__
+        self.tracer.spans.append((self.name, self.start, end - self.start,
+                                  threading.get_ident(), self.tags))
+        return False
+
+    def tag(self, **tags):
+        self.tags.update(tags)
+
+
+class Tracer:
+    # Collects timing spans around hot paths into a fixed-size ring. While disabled, span()
+    # returns a shared no-op, so instrumented code pays one attribute check per call
+    def __init__(self, capacity=TRACE_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self.spans = deque(maxlen=capacity)
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, **tags):
+        # Context manager timing the enclosed block, tagged with e.g. ticker and rows
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, tags)
+
+    def clear(self):
+        # Forget every recorded span
+        self.spans.clear()
+
+    def summary(self):
+        # Per-span-name count, total, mean and max in milliseconds, slowest total first
+        stats = {}
+        for name, _, dur, _, _ in list(self.spans):
+            count, total, peak = stats.get(name, (0, 0, 0))
+            stats[name] = (count + 1, total + dur, max(peak, dur))
+        lines = [f"{'span':<24}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for name, (count, total, peak) in sorted(stats.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<24}{count:>8}{total / 1e6:>12.1f}{total / count / 1e6:>10.2f}"
+                         f"{peak / 1e6:>10.2f}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        # Write the ring as Chrome trace JSON (chrome://tracing, Perfetto): complete events in µs
+        events = [{'name': name, 'ph': 'X', 'ts': (start - self.origin) / 1000, 'dur': dur / 1000,
+                   'pid': os.getpid(), 'tid': tid, 'args': tags}
+                  for name, start, dur, tid, tags in list(self.spans)]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+
+tracer = Tracer(enabled=bool(os.environ.get('STOCKAPP_TRACE')))
+
+
+class YFinanceProvider:
+    # Thin wrapper around yfinance so the data source can be swapped for a fake one
+    host = 'query2.finance.yahoo.com'
+
+    def history(self, ticker, **kwargs):
+        return yf.Ticker(ticker).history(**kwargs)
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info or {}
+
+    def warm(self):
+        # Import yfinance and open its on-disk caches ahead of the first request
+        try:
+            yf.cache.get_tz_cache()
+            yf.cache.get_cookie_cache()
+        except Exception:
+            pass
+
+
+class HostLimiter:
+    # Caps how many calls may be in flight against each provider host
+    def __init__(self, limit=MAX_PER_HOST):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._sems = {}
+
+    def slot(self, host):
+        # Return the semaphore guarding a host, creating it on first use
+        with self._lock:
+            if host not in self._sems:
+                self._sems[host] = threading.BoundedSemaphore(self.limit)
+            return self._sems[host]
+
+
+def safe_name(ticker):
+    # Filesystem-safe version of a ticker symbol
+    return re.sub(r'[^A-Za-z0-9._^-]', '_', ticker)
+
+
+def write_atomically(path, write, mode='wb'):
+    # Call write(f) on a temp file beside `path`, then swap it in. The temp name is unique
+    # per call, so two threads saving the same file never write into each other's temp
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class HistoryStore:
+    # Keeps each ticker's daily history on disk as a columnar .npz file
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def _path(self, ticker):
+        # Map a ticker to its cache file
+        return os.path.join(self.root, f"{safe_name(ticker)}.npz")
+
+    def load(self, ticker):
+        # Return the cached frame for a ticker, or None if nothing usable is stored
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                index = pd.DatetimeIndex(z['Date'].view('datetime64[ns]'), name='Date')
+                cols = {c: z[c] for c in OHLCV_COLUMNS + INDICATOR_COLUMNS if c in z.files}
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        return pd.DataFrame(cols, index=index)
+
+    def save(self, ticker, df, coverage=None):
+        # Write bars and indicators atomically so a crash never leaves a torn file.
+        # `coverage` is the earliest date the history was requested from (None: all of it)
+        os.makedirs(self.root, exist_ok=True)
+        arrays = {c: df[c].to_numpy() for c in OHLCV_COLUMNS + INDICATOR_COLUMNS if c in df}
+        arrays['Date'] = df.index.values.astype('datetime64[ns]').view('int64')
+        if coverage is not None:
+            arrays['Coverage'] = np.array(pd.Timestamp(coverage).value)
+        write_atomically(self._path(ticker), lambda f: np.savez(f, **arrays))
+
+    def coverage(self, ticker):
+        # Earliest date the cached history was requested from; None if it is the full history
+        try:
+            with np.load(self._path(ticker), allow_pickle=False) as z:
+                return pd.Timestamp(int(z['Coverage'])) if 'Coverage' in z.files else None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+
+class InfoCache:
+    # Company fundamentals kept in one JSON file. Each field carries the time it was fetched
+    # and goes stale after its own TTL; beyond `capacity` tickers the least recently used go
+    def __init__(self, path, capacity=INFO_CACHE_SIZE, ttls=INFO_TTLS, clock=time.time):
+        self.path = path
+        self.capacity = capacity
+        self.ttls = ttls
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.entries = OrderedDict()
+        try:
+            with open(path) as f:
+                self.entries.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, ticker):
+        # (info, stale) for a ticker; info is None when nothing is cached
+        with self._lock:
+            entry = self.entries.get(ticker)
+            if entry is None:
+                return None, False
+            self.entries.move_to_end(ticker)
+        now = self.clock()
+        stale = any(field not in entry or now - entry[field][1] > ttl
+                    for field, ttl in self.ttls.items())
+        info = {field: value for field, (value, _) in entry.items() if value is not None}
+        return info, stale
+
+    def put(self, ticker, info):
+        # Stamp every tracked field (absent ones as None, so they are not refetched early) and persist
+        now = self.clock()
+        entry = {field: [info.get(field), now] for field in self.ttls}
+        with self._lock:
+            self.entries[ticker] = entry
+            self.entries.move_to_end(ticker)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+            self._save()
+
+    def _save(self):
+        # Write atomically, as HistoryStore does; called with the lock held
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        write_atomically(self.path, lambda f: json.dump(self.entries, f, default=str), mode='w')
+
+
+class IndicatorEngine:
+    # Running SMA, EMA and volatility state so appending bars costs O(new bars).
+    # Closes and returns live in ring buffers with running sums (and sum of squares
+    # for returns); the sums are re-totalled from the buffer each time it wraps so
+    # floating-point drift cannot build up over a long session.
+    def __init__(self, window=INDICATOR_WINDOW):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.closes = np.zeros(window)
+        self.returns = np.zeros(window)
+        self.n_closes = 0
+        self.n_returns = 0
+        self.close_sum = 0.0
+        self.ret_sum = 0.0
+        self.ret_sumsq = 0.0
+        self.ema = np.nan
+        self.last_close = np.nan
+
+    @classmethod
+    def resume(cls, df, window=INDICATOR_WINDOW):
+        # Rebuild running state from the tail of a frame that already has indicators
+        engine = cls(window)
+        if df.empty:
+            return engine
+        for close in df['Close'].to_numpy()[-(window + 1):]:
+            engine.update(close)
+        engine.ema = float(df['EMA'].iloc[-1])
+        return engine
+
+    def update(self, close):
+        # Consume one close and return (sma, ema, volatility) for that bar
+        w = self.window
+        i = self.n_closes % w
+        self.close_sum += close - self.closes[i]
+        self.closes[i] = close
+        self.n_closes += 1
+        if i == w - 1:
+            self.close_sum = self.closes.sum()
+        if not np.isnan(self.last_close):
+            r = close / self.last_close - 1.0
+            j = self.n_returns % w
+            self.ret_sum += r - self.returns[j]
+            self.ret_sumsq += r * r - self.returns[j] ** 2
+            self.returns[j] = r
+            self.n_returns += 1
+            if j == w - 1:
+                self.ret_sum = self.returns.sum()
+                self.ret_sumsq = (self.returns ** 2).sum()
+        self.last_close = close
+        self.ema = close if np.isnan(self.ema) else self.ema + self.alpha * (close - self.ema)
+        sma = self.close_sum / w if self.n_closes >= w else np.nan
+        vol = np.nan
+        if self.n_returns >= w:
+            var = (self.ret_sumsq - self.ret_sum ** 2 / w) / (w - 1)
+            vol = np.sqrt(max(var, 0.0))
+        return sma, self.ema, vol
+
+    def extend(self, closes):
+        # Consume a batch of closes and return an (n, 3) array of SMA, EMA, volatility
+        out = np.empty((len(closes), 3))
+        for k, close in enumerate(closes):
+            out[k] = self.update(close)
+        return out
+
+    @staticmethod
+    def compute(df, window=INDICATOR_WINDOW):
+        # Vectorized cold-start calculation over a whole frame
+        with tracer.span('indicators', rows=len(df), window=window):
+            df['SMA'] = df['Close'].rolling(window).mean()
+            df['EMA'] = df['Close'].ewm(span=window, adjust=False).mean()
+            df['Volatility'] = df['Close'].pct_change().rolling(window).std()
+
+
+def _window_sums(csum, window):
+    # Trailing window totals from a cumulative sum along axis 0; NaN until the window fills
+    out = np.full(csum.shape, np.nan)
+    if len(csum) >= window:
+        out[window - 1] = csum[window - 1]
+        out[window:] = csum[window:] - csum[:-window]
+    return out
+
+
+def sma_windows(values, windows):
+    # Simple moving averages for every window from a single cumulative-sum pass
+    csum = np.cumsum(values, axis=0)
+    return [_window_sums(csum, w) / w for w in windows]
+
+
+def ema_windows(values, windows):
+    # EMAs (adjust=False) for every window; the recurrence runs in pandas' compiled ewm,
+    # over every column at once
+    frame = pd.DataFrame(values)
+    return [frame.ewm(span=w, adjust=False).mean().to_numpy() for w in windows]
+
+
+def volatility_windows(values, windows):
+    # Rolling sample std of returns for every window from one pass of sums and sums of squares
+    returns = values[1:] / values[:-1] - 1.0
+    csum = np.cumsum(returns, axis=0)
+    csq = np.cumsum(returns * returns, axis=0)
+    results = []
+    for w in windows:
+        out = np.full(values.shape, np.nan)
+        s1, s2 = _window_sums(csum, w), _window_sums(csq, w)
+        out[1:] = np.sqrt(np.maximum((s2 - s1 * s1 / w) / (w - 1), 0.0))
+        results.append(out)
+    return results
+
+
+# Indicator registry: name -> function(closes, windows) returning one array per window.
+# closes is (rows x columns); each function shares its heavy work across all windows.
+INDICATORS = {
+    'SMA': sma_windows,
+    'EMA': ema_windows,
+    'Volatility': volatility_windows,
+}
+DEFAULT_WINDOWS = {name: [INDICATOR_WINDOW] for name in INDICATORS}
+# Warm-up length per indicator in multiples of its window; the EMA's weight on bars before
+# the warm-up is (1 - 2/(w+1)) ** (5w), about 5e-5
+WARMUP_SPANS = {'SMA': 1, 'EMA': 5, 'Volatility': 1}
+# Line styles that tell several windows of one ticker apart
+WINDOW_STYLES = ['-', '--', ':', '-.']
+
+
+def parse_windows(name, text):
+    # '5, 20 50' -> [5, 20, 50]; raises ValueError unless every window is an integer >= 2
+    try:
+        ws = sorted({int(w) for w in text.replace(',', ' ').split()})
+    except ValueError:
+        ws = []
+    if not ws or ws[0] < 2:
+        raise ValueError(f"{name} needs one or more whole-number windows of at least 2 bars")
+    return ws
+
+
+def warmup_start(start, windows):
+    # Earliest date to load so every window is warm by `start`: w + 1 bars for SMA and
+    # volatility, WARMUP_SPANS x w for the EMA (whose start-up error only decays), in
+    # calendar days with slack for weekends and holidays
+    windows = {name: list(ws) + [INDICATOR_WINDOW] for name, ws in windows.items()}
+    bars = max(w * WARMUP_SPANS.get(name, 1) + 1 for name, ws in windows.items() for w in ws)
+    return pd.Timestamp(start) - pd.Timedelta(days=bars * 7 // 5 + 14)
+
+
+def covers(coverage, since):
+    # True if history requested from `coverage` reaches back to `since` (None meaning all history)
+    return coverage is None or (since is not None and coverage <= since)
+
+
+def parse_indicator_spec(spec):
+    # 'SMA=5,20,50;EMA=12,26' -> {'SMA': [5, 20, 50], 'EMA': [12, 26]}
+    windows = {}
+    for part in filter(None, (p.strip() for p in spec.split(';'))):
+        name, _, text = part.partition('=')
+        name = name.strip()
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}' (choose from {', '.join(INDICATORS)})")
+        windows[name] = parse_windows(name, text)
+    return windows
+
+
+class Panel:
+    # Tickers aligned on one shared calendar: for each field a contiguous (dates x tickers)
+    # float array, NaN where a ticker has no bar on that date
+    def __init__(self, dates, tickers, fields):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.fields = fields
+        self.col = {t: j for j, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_frames(cls, frames, fields=('Open', 'High', 'Low', 'Close', 'Volume')):
+        # Align a {ticker: frame} dict onto the union of their dates
+        stamps = {t: df.index.values.astype('datetime64[ns]').view('int64') for t, df in frames.items()}
+        dates = np.unique(np.concatenate(list(stamps.values()))) if stamps else np.empty(0, 'int64')
+        arrays = {f: np.full((len(dates), len(frames)), np.nan) for f in fields}
+        for j, (t, df) in enumerate(frames.items()):
+            rows = np.searchsorted(dates, stamps[t])
+            for f in fields:
+                if f in df:
+                    arrays[f][rows, j] = df[f].to_numpy(dtype=float)
+        return cls(dates, frames, arrays)
+
+    def compute_indicators(self, window=INDICATOR_WINDOW):
+        # SMA, EMA and volatility for every ticker in one vectorized pass. Each column is first
+        # packed so its own bars are contiguous at the top, which keeps per-ticker semantics
+        # (padding on other tickers' trading days never enters a window), then scattered back.
+        with tracer.span('indicators.panel', tickers=len(self.tickers), rows=len(self.dates)):
+            close = self.fields['Close']
+            valid = ~np.isnan(close)
+            order = np.argsort(~valid, axis=0, kind='stable')
+            packed = np.take_along_axis(close, order, axis=0)
+            for name, fn in INDICATORS.items():
+                values, = fn(packed, [window])
+                out = np.full(close.shape, np.nan)
+                np.put_along_axis(out, order, values, axis=0)
+                out[~valid] = np.nan
+                self.fields[name] = out
+
+
+class Comparison:
+    # Cross-ticker analytics over one date range of a Panel, each a batched array operation
+    # over all tickers: returns rebased to the first bar in range, the return correlation
+    # matrix, and rolling correlation and beta of every ticker against a benchmark
+    def __init__(self, dates, tickers, rebased, corr, rolling_corr, rolling_beta, benchmark, window):
+        self.dates = dates
+        self.x = mdates.date2num(dates.view('datetime64[ns]'))
+        self.tickers = tickers
+        self.rebased = rebased
+        self.corr = corr
+        self.rolling_corr = rolling_corr
+        self.rolling_beta = rolling_beta
+        self.benchmark = benchmark
+        self.window = window
+
+    @classmethod
+    def from_panel(cls, panel, lo, hi, benchmark, window=COMPARE_WINDOW):
+        # Compare the tickers over panel rows [lo, hi). Closes are carried forward across
+        # other tickers' trading days, so a return is only counted on a ticker's own bars
+        close = panel.fields['Close'][lo:hi]
+        rows, n = close.shape
+        valid = ~np.isnan(close)
+        last = np.maximum.accumulate(np.where(valid, np.arange(rows)[:, None], 0), axis=0)
+        filled = np.take_along_axis(close, last, axis=0)
+        filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+        first = np.take_along_axis(close, valid.argmax(axis=0)[None, :], axis=0)
+        rebased = (filled / first - 1.0) * 100.0
+        returns = np.full(close.shape, np.nan)
+        returns[1:] = close[1:] / filled[:-1] - 1.0
+        mask = ~np.isnan(returns)
+        r = np.where(mask, returns, 0.0)
+        m = mask.astype(float)
+        # Pairwise-complete correlation: every sum runs over the rows both tickers traded
+        count = m.T @ m
+        sx = r.T @ m
+        sxx = (r * r).T @ m
+        sxy = r.T @ r
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = count * sxy - sx * sx.T
+            corr = cov / np.sqrt((count * sxx - sx * sx) * (count * sxx.T - sx.T * sx.T))
+        corr[count < 2] = np.nan
+        # Rolling statistics against the benchmark from windowed sums of the joint rows
+        b = panel.col[benchmark]
+        joint = m * m[:, b:b + 1]
+        x, y = r * joint, r[:, b:b + 1] * joint
+        sums = [_window_sums(np.cumsum(a, axis=0), window)
+                for a in (joint, x, y, x * y, x * x, y * y)]
+        k, s_x, s_y, s_xy, s_xx, s_yy = sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = k * s_xy - s_x * s_y
+            var_y = k * s_yy - s_y * s_y
+            rolling_beta = cov / var_y
+            rolling_corr = cov / np.sqrt((k * s_xx - s_x * s_x) * var_y)
+        sparse = k < max(2, window // 2)
+        rolling_beta[sparse] = np.nan
+        rolling_corr[sparse] = np.nan
+        return cls(panel.dates[lo:hi], panel.tickers, rebased, corr, rolling_corr, rolling_beta,
+                   benchmark, window)
+
+
+def resample_ohlcv(df, level):
+    # Aggregate daily bars into weekly ('W'), monthly ('M') or quarterly ('Q') bars dated at
+    # each period's last session: first open, highest high, lowest low, last close, summed
+    # volume, with the indicators recomputed on the coarser closes
+    if df.empty:
+        return df.iloc[:0]
+    dates = df.index.values.astype('datetime64[ns]')
+    if level == 'W':
+        # Day 0 (1970-01-01) was a Thursday, so shifting by 3 makes weeks start on Monday
+        keys = (dates.astype('datetime64[D]').astype(np.int64) + 3) // 7
+    else:
+        keys = dates.astype('datetime64[M]').astype(np.int64)
+        if level == 'Q':
+            keys = keys // 3
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    cols = {}
+    if 'Open' in df:
+        cols['Open'] = df['Open'].to_numpy()[starts]
+    if 'High' in df:
+        cols['High'] = np.fmax.reduceat(df['High'].to_numpy(), starts)
+    if 'Low' in df:
+        cols['Low'] = np.fmin.reduceat(df['Low'].to_numpy(), starts)
+    cols['Close'] = df['Close'].to_numpy()[ends]
+    if 'Volume' in df:
+        cols['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+    out = pd.DataFrame(cols, index=pd.DatetimeIndex(dates[ends], name='Date'))
+    IndicatorEngine.compute(out)
+    return out
+
+
+class TickerSeries:
+    # One ticker's int64 timestamps and contiguous metric columns, built once per frame
+    # so redraws resolve ranges with searchsorted and slice NumPy views
+    def __init__(self, df, levels=LOD_LEVELS):
+        self.dates = df.index.values.astype('datetime64[ns]').view('int64')
+        self.x = mdates.date2num(df.index.values)
+        # float32 is plenty for plotting; float32 frame columns are viewed, not copied
+        self.columns = {m: np.ascontiguousarray(df[m].to_numpy(dtype=np.float32))
+                        for m in METRICS if m in df}
+        # (indicator, window) -> values, seeded with the columns the frame already carries
+        self.memo = {(m, INDICATOR_WINDOW): self.columns[m] for m in INDICATORS if m in self.columns}
+        # Pyramid of coarser series (each with its own indicators) for long visible ranges;
+        # a level is resampled from the frame the first time a range needs it, then kept
+        self.frame = df
+        self.levels = list(levels)
+        self.pyramid = {}
+        # Called with this series whenever it grows (new indicator windows or pyramid levels)
+        self.on_resize = None
+
+    def indicator(self, name, windows):
+        # {window: values} for a registered indicator, computing only windows not yet memoized
+        missing = [w for w in windows if (name, w) not in self.memo]
+        if missing:
+            # Running sums need float64; results are stored back as float32
+            closes = self.columns['Close'].astype(float)[:, None]
+            with tracer.span('indicators.windows', indicator=name, windows=missing, rows=len(closes)):
+                for w, values in zip(missing, INDICATORS[name](closes, missing)):
+                    self.memo[(name, w)] = values[:, 0].astype(np.float32)
+            self._resized()
+        return {w: self.memo[(name, w)] for w in windows}
+
+    def nbytes(self):
+        # Bytes held by this series; columns that view a frame are counted with the frame
+        arrays = {id(a): a for a in [*self.columns.values(), *self.memo.values()]}
+        return (self.dates.nbytes + self.x.nbytes + sum(a.nbytes for a in arrays.values() if a.flags.owndata)
+                + sum(s.nbytes() for s in self.pyramid.values()))
+
+    def level(self, depth):
+        # (level name, series) `depth` steps up the pyramid; depth 0 is this daily series
+        if depth == 0:
+            return 'D', self
+        level = self.levels[depth - 1]
+        if level not in self.pyramid:
+            coarse = TickerSeries(resample_ohlcv(self.frame, level), levels=())
+            coarse.on_resize = lambda _: self._resized()
+            self.pyramid[level] = coarse
+            self._resized()
+        return level, self.pyramid[level]
+
+    def _resized(self):
+        # Tell the owner (the dataset manager) to re-measure this series
+        if self.on_resize is not None:
+            self.on_resize(self)
+
+    def level_bounds(self, bounds, depth):
+        # Map daily [lo, hi) bounds onto the bars of a pyramid level
+        lo, hi = bounds
+        if depth == 0 or hi <= lo:
+            return bounds
+        s = self.level(depth)[1]
+        # A coarse bar is dated at its period's last session, so the one holding the last
+        # visible day is the first dated on or after it
+        l = int(np.searchsorted(s.dates, self.dates[lo], side='left'))
+        h = min(int(np.searchsorted(s.dates, self.dates[hi - 1], side='left')) + 1, len(s.dates))
+        return l, h
+
+    def lod(self, bounds, budget):
+        # Shallowest pyramid depth at which a daily range has at most `budget` bars
+        for depth in range(len(self.levels) + 1):
+            lo, hi = self.level_bounds(bounds, depth)
+            if hi - lo <= budget:
+                return depth
+        return len(self.levels)
+
+    def bounds(self, start, end):
+        # Integer [lo, hi) covering start..end inclusive; the full series if that is empty
+        lo = int(np.searchsorted(self.dates, pd.Timestamp(start).value, side='left'))
+        hi = int(np.searchsorted(self.dates, (pd.Timestamp(end) + pd.Timedelta(days=1)).value,
+                                 side='left'))
+        return (lo, hi) if hi > lo else (0, len(self.dates))
+
+
+class DatasetManager:
+    # Frames and plotting series for every ticker loaded this session, stored compactly and
+    # evicted least recently used first once over a byte budget. Active tickers (the ones
+    # on screen) are never evicted, so the budget can be exceeded by a single large fetch
+    def __init__(self, budget=MEMORY_BUDGET, max_age=DATASET_MAX_AGE, clock=time.time):
+        self.budget = budget
+        self.max_age = max_age
+        self.clock = clock
+        self._lock = threading.Lock()
+        # ticker -> (frame, series, loaded at, coverage, frame bytes, series bytes), least
+        # recently used first; sizes are measured once and re-measured only when a series grows
+        self.entries = OrderedDict()
+        self.active = set()
+        self.total = 0
+
+    @staticmethod
+    def compact(df):
+        # Only the plotted columns: float32 prices and indicators, int64 volume, ns timestamps
+        cols = {}
+        for c in DATASET_COLUMNS:
+            if c == 'Volume' and c in df:
+                cols[c] = df[c].fillna(0).to_numpy(dtype=np.int64)
+            elif c in df:
+                cols[c] = df[c].to_numpy(dtype=np.float32)
+        index = pd.DatetimeIndex(df.index.values.astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame(cols, index=index)
+
+    def get(self, ticker, since=None):
+        # The held frame for a ticker if it was loaded recently enough and reaches back to
+        # `since` (None: needs the full history), else None
+        with self._lock:
+            entry = self.entries.get(ticker)
+            if entry is None or self.clock() - entry[2] > self.max_age or not covers(entry[3], since):
+                return None
+            self.entries.move_to_end(ticker)
+            return entry[0]
+
+    def put(self, ticker, df, coverage=None):
+        # Hold a ticker's frame (compacted unless it is the one already held) loaded from
+        # `coverage` onwards and mark it active; returns (frame, series)
+        with self._lock:
+            entry = self.entries.get(ticker)
+            if entry is None or entry[0] is not df:
+                frame = self.compact(df)
+                series = TickerSeries(frame)
+                series.on_resize = lambda s, t=ticker: self._resize(t, s)
+                if entry is not None:
+                    self.total -= entry[4] + entry[5]
+                entry = (frame, series, self.clock(), coverage,
+                         int(frame.memory_usage(index=True).sum()), series.nbytes())
+                self.entries[ticker] = entry
+                self.total += entry[4] + entry[5]
+            self.entries.move_to_end(ticker)
+            self.active.add(ticker)
+            self._evict()
+            return entry[0], entry[1]
+
+    def covers(self, ticker, since):
+        # True if the held frame for a ticker reaches back to `since`
+        with self._lock:
+            entry = self.entries.get(ticker)
+            return entry is not None and covers(entry[3], since)
+
+    def deactivate(self):
+        # Nothing is on screen any more; every held ticker becomes evictable
+        with self._lock:
+            self.active.clear()
+
+    def footprint(self):
+        # (bytes held, tickers held)
+        with self._lock:
+            return self.total, len(self.entries)
+
+    def _resize(self, ticker, series):
+        # A held series grew: update its recorded size and the running total
+        with self._lock:
+            entry = self.entries.get(ticker)
+            if entry is None or entry[1] is not series:
+                return
+            nbytes = series.nbytes()
+            self.total += nbytes - entry[5]
+            self.entries[ticker] = entry[:5] + (nbytes,)
+            self._evict()
+
+    def _evict(self):
+        # Drop inactive tickers, oldest use first, until under budget; called with the lock held
+        for ticker in [t for t in self.entries if t not in self.active]:
+            if self.total <= self.budget:
+                break
+            entry = self.entries.pop(ticker)
+            self.total -= entry[4] + entry[5]
 
 
 class DataHandler:
     # Manages fetching and processing stock data
-    def __init__(self):
+    def __init__(self, store=None, provider=None, workers=FETCH_WORKERS, limiter=None, info_cache=None,
+                 datasets=None):
+        # data and series hold the active tickers; datasets also keeps earlier ones for reuse
         self.data = {}
+        self.series = {}
+        self._panel = None
+        # (tickers, start, end, benchmark, window) -> Comparison for the current panel
+        self._comparisons = OrderedDict()
+        self.datasets = datasets if datasets is not None else DatasetManager()
+        self.store = store if store is not None else HistoryStore()
+        if info_cache is None:
+            info_cache = InfoCache(os.path.join(self.store.root, 'fundamentals.json'))
+        self.info_cache = info_cache
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.workers = workers
+        self.limiter = limiter if limiter is not None else HostLimiter()
 
-    def fetch(self, tickers):
-        # Download history and compute indicators for each ticker
-        colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
-        color_map = {t: colors[i % len(colors)] for i, t in enumerate(tickers)}
-        self.data.clear()
-        infos = []
+    def warm(self):
+        # Load the heavy modules and run any provider setup; meant for a background thread
+        for module in WARM_MODULES:
+            getattr(module, '__name__')
+        warm = getattr(self.provider, 'warm', None)
+        if warm is not None:
+            warm()
+
+    def fetch(self, tickers, since=None):
+        # Download history from `since` (all of it if None) and info for all tickers and
+        # block until every one is done
+        color_map = self.color_map(tickers)
+        self.clear()
+        frames, texts = {}, {}
+        for t, df, text in self.stream(tickers, since=since):
+            if df is not None:
+                frames[t] = df
+            texts[t] = text
         for t in tickers:
-            obj = yf.Ticker(t)
-            df = obj.history(period='max')
-            if df is None or df.empty:
-                infos.append(f"No data for {t}\n")
-                continue
-            # Calculate rolling and exponential moving averages
-            df['SMA'] = df['Close'].rolling(20).mean()
-            df['EMA'] = df['Close'].ewm(span=20, adjust=False).mean()
-            # Calculate volatility as rolling std of returns
-            df['Volatility'] = df['Close'].pct_change().rolling(20).std()
-            self.data[t] = df
-            info = obj.info or {}
-            infos.append(self._format_info(t, info))
-        return infos, color_map
+            if t in frames:
+                self.add(t, frames[t], since)
+        return [texts[t] for t in tickers], color_map
+
+    def add(self, ticker, df, since=None):
+        # Make a ticker active, storing its frame (history from `since`) compactly along
+        # with its plotting arrays. The frame only reaches back as far as the cache does,
+        # which is short of `since` when extending the head failed offline
+        stored = self.store.coverage(ticker)
+        coverage = since if covers(stored, since) else stored
+        self.data[ticker], self.series[ticker] = self.datasets.put(ticker, df, coverage)
+        self._panel = None
+        self._comparisons.clear()
+
+    def uncovered(self, since):
+        # Active tickers whose held history starts after `since`
+        return [t for t in self.data if not self.datasets.covers(t, since)]
+
+    def clear(self):
+        # Deactivate every loaded ticker; the dataset manager keeps them until evicted
+        self.data.clear()
+        self.series.clear()
+        self.datasets.deactivate()
+        self._panel = None
+        self._comparisons.clear()
+
+    def panel(self):
+        # Loaded tickers' closes as an aligned Panel (all that compare() reads), built on
+        # first use after a change
+        if self._panel is None:
+            self._panel = Panel.from_frames(self.data, fields=('Close',))
+        return self._panel
+
+    def export_frames(self, start, end):
+        # Full-precision start..end frames for export: held datasets are compacted (float32,
+        # plotted columns only), so each ticker is re-read from the history cache when it is
+        # there. Only a copy of the range is kept, so full histories are freed one by one
+        frames = {}
+        for t, df in self.data.items():
+            cached = self.store.load(t)
+            frames[t] = (df if cached is None or cached.empty else cached).loc[start:end].copy()
+        return frames
+
+    def compare(self, start, end, benchmark, window=COMPARE_WINDOW):
+        # Cross-ticker comparison over start..end, cached until the loaded data changes
+        key = (tuple(self.data), start, end, benchmark, window)
+        result = self._comparisons.get(key)
+        if result is None:
+            panel = self.panel()
+            lo = int(np.searchsorted(panel.dates, pd.Timestamp(start).value, side='left'))
+            hi = int(np.searchsorted(panel.dates, (pd.Timestamp(end) + pd.Timedelta(days=1)).value,
+                                     side='left'))
+            if hi - lo < 2:
+                return None
+            with tracer.span('compare', tickers=len(panel.tickers), rows=hi - lo, window=window):
+                result = Comparison.from_panel(panel, lo, hi, benchmark, window)
+            self._comparisons[key] = result
+            if len(self._comparisons) > COMPARE_CACHE_SIZE:
+                self._comparisons.popitem(last=False)
+        self._comparisons.move_to_end(key)
+        return result
+
+    def bounds(self, start, end):
+        # Resolve a date range once into integer bounds for every loaded ticker
+        with tracer.span('slice', tickers=len(self.series)):
+            return {t: s.bounds(start, end) for t, s in self.series.items()}
+
+    @staticmethod
+    def with_indicators(df, windows):
+        # Raw bars plus one '<indicator>_<window>' column per selected window
+        out = df.drop(columns=[c for c in INDICATOR_COLUMNS if c in df])
+        closes = df['Close'].to_numpy(dtype=float)[:, None]
+        for name, ws in windows.items():
+            for w, values in zip(ws, INDICATORS[name](closes, ws)):
+                out[f"{name}_{w}"] = values[:, 0]
+        return out
+
+    def stream(self, tickers, cancel=None, since=None):
+        # Yield (ticker, frame or None, info text) for each ticker as soon as it is ready,
+        # frames holding history from `since` on (all of it if None). Does not touch
+        # self.data (held frames are only read, under the manager's lock), so it is safe
+        # to run off the GUI thread.
+        if not tickers:
+            return
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.workers, 2 * len(tickers))))
+        try:
+            # Tickers loaded recently are reused as held; only the rest go to cache and network
+            held = {t: self.datasets.get(t, since) for t in tickers}
+            histories = {pool.submit(self._load_history, t, since): t for t in tickers if held[t] is None}
+            details = {t: pool.submit(self._load_info, t) for t in tickers}
+            for t in tickers:
+                if held[t] is not None:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    yield t, held[t], self._format_info(t, details[t].result())
+            for fut in as_completed(histories):
+                if cancel is not None and cancel.is_set():
+                    return
+                t = histories[fut]
+                df = fut.result()
+                if df is None or df.empty:
+                    yield t, None, f"No data for {t}\n"
+                    continue
+                yield t, df, self._format_info(t, details[t].result())
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def revalidate(self, tickers, cancel=None):
+        # Refetch fundamentals that stream() served stale from the cache and yield
+        # (ticker, info text) for each one the provider answered
+        stale = [t for t in tickers if self.info_cache.lookup(t)[1]]
+        if not stale:
+            return
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(stale))))
+        try:
+            refreshes = {pool.submit(self._refresh_info, t): t for t in stale}
+            for fut in as_completed(refreshes):
+                if cancel is not None and cancel.is_set():
+                    return
+                t = refreshes[fut]
+                info = fut.result()
+                if info:
+                    yield t, self._format_info(t, info)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def color_map(tickers):
+        # Assign each ticker a stable color from the matplotlib cycle
+        colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        return {t: colors[i % len(colors)] for i, t in enumerate(tickers)}
+
+    def _call(self, method, ticker, **kwargs):
+        # Invoke a provider method under the host limit, retrying with jittered backoff
+        fn = getattr(self.provider, method)
+        host = getattr(self.provider, 'host', 'default')
+        for attempt in range(FETCH_RETRIES):
+            try:
+                with self.limiter.slot(host), tracer.span(f"provider.{method}", ticker=ticker,
+                                                          attempt=attempt) as span:
+                    result = fn(ticker, **kwargs)
+                    if isinstance(result, pd.DataFrame):
+                        span.tag(rows=len(result))
+                    return result
+            except Exception:
+                if attempt == FETCH_RETRIES - 1:
+                    raise
+                time.sleep(RETRY_BACKOFF * (2 ** attempt) * (1 + random.random()))
+
+    def _load_info(self, ticker):
+        # Company details for the INFO tab, from the cache even if stale (revalidate() catches
+        # up later); an unreachable provider just yields N/A fields
+        info, _ = self.info_cache.lookup(ticker)
+        if info is None:
+            info = self._refresh_info(ticker)
+        return info or {}
+
+    def _refresh_info(self, ticker):
+        # Ask the provider for fundamentals and cache the answer; None if it failed
+        try:
+            info = self._call('info', ticker)
+        except Exception:
+            return None
+        if info:
+            self.info_cache.put(ticker, info)
+        return info
+
+    def _load_history(self, ticker, since=None):
+        # History from `since` on (all of it if None) with indicators warmed up on whatever
+        # the cache holds before that, timed as one span (cache, network, merge)
+        with tracer.span('history', ticker=ticker) as span:
+            df = self._refresh_history(ticker, since)
+            if df is not None and since is not None:
+                df = df[df.index >= since]
+            span.tag(rows=0 if df is None else len(df))
+            return df
+
+    def _refresh_history(self, ticker, since=None):
+        # Serve history from the cache, downloading only bars after the last one held and,
+        # if the cache does not reach back to `since`, the missing bars before the first
+        cached = self.store.load(ticker)
+        if cached is None or cached.empty:
+            return self._download(ticker, since)
+        coverage = self.store.coverage(ticker)
+        if any(c not in cached for c in INDICATOR_COLUMNS):
+            # Cache written without indicators: compute them once and keep them
+            IndicatorEngine.compute(cached)
+            self.store.save(ticker, cached, coverage)
+        if not covers(coverage, since):
+            cached, coverage = self._extend_head(ticker, cached, coverage, since)
+        # Re-request from the bar before the last one: the last bar may have been
+        # captured mid-session, the one before it is final and shows any re-basing
+        anchor = cached.index[-2] if len(cached) > 1 else cached.index[-1]
+        try:
+            new = self._normalize(self._call('history', ticker, start=anchor.strftime('%Y-%m-%d')))
+        except Exception:
+            # Provider unreachable: work offline from what is cached
+            return cached.copy()
+        if new.empty:
+            return cached.copy()
+        if self._adjusted_since(cached, new):
+            # A split or dividend re-based the adjusted prices, so the cache is stale
+            return self._download(ticker, coverage)
+        # Indicators for the kept bars are cached; only the new bars go through the engine
+        kept = cached[cached.index < new.index[0]]
+        engine = IndicatorEngine.resume(kept)
+        new[INDICATOR_COLUMNS] = engine.extend(new['Close'].to_numpy(dtype=float))
+        merged = pd.concat([kept, new])
+        self.store.save(ticker, merged, coverage)
+        return merged
+
+    def _extend_head(self, ticker, cached, coverage, since):
+        # Prepend the bars from `since` up to the first cached one; returns (frame, coverage).
+        # Offline, the cache is returned as it was and the gap is retried next time
+        first = cached.index[0]
+        try:
+            if since is None:
+                head = self._normalize(self._call('history', ticker, period='max'))
+                head = head[head.index <= first]
+            else:
+                head = self._normalize(self._call('history', ticker, start=since.strftime('%Y-%m-%d'),
+                                                  end=(first + pd.Timedelta(days=1)).strftime('%Y-%m-%d')))
+        except Exception:
+            return cached, coverage
+        if first in head.index:
+            # The shared bar must agree, or prices were re-based since the cache was written
+            if not np.isclose(head.at[first, 'Close'], cached.at[first, 'Close'], rtol=1e-6):
+                fresh = self._download(ticker, since)
+                return (cached, coverage) if fresh is None or fresh.empty else (fresh, since)
+            head = head[head.index < first]
+        merged = pd.concat([head, cached[[c for c in OHLCV_COLUMNS if c in cached]]])
+        # The EMA depends on where the series starts, so the whole frame is recomputed
+        IndicatorEngine.compute(merged)
+        self.store.save(ticker, merged, since)
+        return merged, since
+
+    def _download(self, ticker, since=None):
+        # Fetch history from `since` (the entire history if None) and replace whatever is cached
+        try:
+            if since is None:
+                raw = self._call('history', ticker, period='max')
+            else:
+                raw = self._call('history', ticker, start=since.strftime('%Y-%m-%d'))
+            df = self._normalize(raw)
+        except Exception:
+            return None
+        if not df.empty:
+            IndicatorEngine.compute(df)
+            self.store.save(ticker, df, since)
+        return df
+
+    @staticmethod
+    def _normalize(df):
+        # Keep raw columns on a sorted, tz-naive, de-duplicated daily index
+        if df is None or df.empty:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].copy()
+        if df.index.tz is not None:
+            df.index = df.index.tz_localize(None)
+        df.index.name = 'Date'
+        # Bars without a close cannot feed the indicators or the charts
+        df = df[~df.index.duplicated(keep='last')].dropna(subset=['Close']).sort_index()
+        return df
+
+    @staticmethod
+    def _adjusted_since(cached, new):
+        # True if the new bars carry an unseen corporate action or disagree with a final bar
+        tail = new[new.index >= cached.index[-1]]
+        known = cached.reindex(tail.index)
+        for col in ('Dividends', 'Stock Splits'):
+            if col in tail and col in known:
+                seen = tail[col].fillna(0)
+                if ((seen != 0) & (seen != known[col].fillna(0))).any():
+                    return True
+        overlap = new.index.intersection(cached.index[:-1])
+        if overlap.empty:
+            return False
+        old = cached.loc[overlap, 'Close'].to_numpy()
+        cur = new.loc[overlap, 'Close'].to_numpy()
+        return not np.allclose(old, cur, rtol=1e-6, equal_nan=True)
 
     @staticmethod
     def _format_info(ticker, info):
@@ -63,12 +1136,518 @@ class DataHandler:
         )
 
 
+class RingBuffer:
+    # Fixed-capacity window over the newest rows. Every row is written twice into a
+    # double-length array so the live window is always one contiguous slice: appends
+    # are O(1) and view() is zero-copy, and memory never grows past 2 x capacity rows
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.buf = np.full((2 * capacity, width), np.nan)
+        self.start = 0
+        self.size = 0
+
+    def append(self, rows):
+        # Add rows oldest first, dropping the oldest held rows once full
+        for row in rows[-self.capacity:]:
+            i = (self.start + self.size) % self.capacity
+            self.buf[i] = row
+            self.buf[i + self.capacity] = row
+            if self.size < self.capacity:
+                self.size += 1
+            else:
+                self.start = (self.start + 1) % self.capacity
+
+    def view(self):
+        # The held rows, oldest first, as a view into the backing array
+        return self.buf[self.start:self.start + self.size]
+
+
+class LiveFeed:
+    # Polls minute bars for a set of tickers and keeps only bars newer than the last one
+    # seen, feeding each into a ring buffer and the incremental indicator engine
+    def __init__(self, tickers, handler, capacity=LIVE_CAPACITY, window=INDICATOR_WINDOW):
+        self.tickers = list(tickers)
+        self.handler = handler
+        self.last = {t: None for t in self.tickers}
+        self.buffers = {t: RingBuffer(capacity, len(LIVE_COLUMNS)) for t in self.tickers}
+        self.engines = {t: IndicatorEngine(window) for t in self.tickers}
+
+    def poll(self):
+        # Fetch and absorb new bars for every ticker; returns {ticker: new bar count}
+        with tracer.span('live.poll', tickers=len(self.tickers)) as span:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.handler.workers, len(self.tickers)))) as pool:
+                bars = dict(zip(self.tickers, pool.map(self._fetch, self.tickers)))
+            counts = {t: self._absorb(t, df) for t, df in bars.items()}
+            span.tag(rows=sum(counts.values()))
+            return counts
+
+    def _fetch(self, ticker):
+        # Today's minute bars on the first poll, afterwards only those after the last seen bar
+        last = self.last[ticker]
+        try:
+            if last is None:
+                df = self.handler._call('history', ticker, period='1d', interval='1m')
+            else:
+                df = self.handler._call('history', ticker, start=(last + pd.Timedelta(minutes=1))
+                                        .to_pydatetime(), interval='1m')
+        except Exception:
+            return None
+        if df is None or df.empty:
+            return None
+        if df.index.tz is not None:
+            df = df.tz_localize(None)
+        return df.dropna(subset=['Close'])
+
+    def _absorb(self, ticker, df):
+        # Push bars newer than the last seen one through the engine into the ring buffer
+        last = self.last[ticker]
+        if df is None:
+            return 0
+        if last is not None:
+            df = df[df.index > last]
+        if df.empty:
+            return 0
+        closes = df['Close'].to_numpy(dtype=float)
+        rows = np.empty((len(df), len(LIVE_COLUMNS)))
+        rows[:, 0] = mdates.date2num(df.index.to_numpy())
+        rows[:, 1] = closes
+        rows[:, 2] = df['Volume'].to_numpy(dtype=float) if 'Volume' in df else np.nan
+        rows[:, 3:] = self.engines[ticker].extend(closes)
+        self.buffers[ticker].append(rows)
+        self.last[ticker] = df.index[-1]
+        return len(df)
+
+
+class DataExporter:
+    # Streams the selected date range of each ticker to disk in fixed-size chunks,
+    # so memory stays flat however many tickers or years are exported
+    def __init__(self, frames, start, end, chunk_rows=EXPORT_CHUNK_ROWS):
+        self.frames = frames
+        self.start = start
+        self.end = end
+        self.chunk_rows = chunk_rows
+
+    def write(self, fmt, path):
+        # Dispatch to the writer for a format in DATA_FORMATS
+        if not any(len(df.loc[self.start:self.end]) for df in self.frames.values()):
+            raise RuntimeError("No data in the selected range to export")
+        with tracer.span('export', fmt=fmt, tickers=len(self.frames)):
+            getattr(self, f"_write_{fmt.lower()}")(path)
+
+    def _chunks(self):
+        # Yield (ticker, chunk) for every ticker in turn
+        for t, df in self.frames.items():
+            for chunk in self._frame_chunks(df):
+                yield t, chunk
+
+    def _frame_chunks(self, df):
+        # Yield one frame's selected range in pieces, date index moved into a 'Date' column
+        sl = df.loc[self.start:self.end]
+        for i in range(0, len(sl), self.chunk_rows):
+            chunk = sl.iloc[i:i + self.chunk_rows].reset_index()
+            yield chunk.rename(columns={chunk.columns[0]: 'Date'})
+
+    def _write_csv(self, path):
+        # One long table with a leading Ticker column, header written once
+        with open(path, 'w', newline='') as f:
+            first = True
+            for t, chunk in self._chunks():
+                chunk.insert(0, 'Ticker', t)
+                chunk.to_csv(f, header=first, index=False, date_format='%Y-%m-%d')
+                first = False
+
+    def _write_json(self, path):
+        # {ticker: [records]} written record batch by record batch
+        with open(path, 'w') as f:
+            f.write('{')
+            for k, (t, df) in enumerate(self.frames.items()):
+                f.write(f"{',' if k else ''}{json.dumps(t)}:[")
+                for i, chunk in enumerate(self._frame_chunks(df)):
+                    chunk['Date'] = chunk['Date'].dt.strftime('%Y-%m-%d')
+                    # pandas rounds to 10 decimals by default; keep every significant digit
+                    records = chunk.to_json(orient='records', double_precision=15)
+                    f.write((',' if i else '') + records[1:-1])
+                f.write(']')
+            f.write('}')
+
+    def _write_excel(self, path):
+        # One sheet per ticker, appended chunk by chunk
+        with pd.ExcelWriter(path) as writer:
+            for t, df in self.frames.items():
+                sl = df.loc[self.start:self.end]
+                for i in range(0, max(len(sl), 1), self.chunk_rows):
+                    part = sl.iloc[i:i + self.chunk_rows]
+                    part.to_excel(writer, sheet_name=t, startrow=i + 1 if i else 0, header=not i)
+
+    def _write_parquet(self, path):
+        # Row group per chunk through pyarrow's streaming writer
+        pa = self._arrow()
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for t, chunk in self._chunks():
+                chunk.insert(0, 'Ticker', t)
+                table = pa.Table.from_pandas(chunk, preserve_index=False,
+                                             schema=writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _write_feather(self, path):
+        # Feather v2 is the Arrow IPC file format: one record batch per chunk
+        pa = self._arrow()
+        sink, writer, schema = None, None, None
+        try:
+            for t, chunk in self._chunks():
+                chunk.insert(0, 'Ticker', t)
+                table = pa.Table.from_pandas(chunk, preserve_index=False, schema=schema)
+                if writer is None:
+                    schema = table.schema
+                    sink = pa.OSFile(path, 'wb')
+                    writer = pa.ipc.new_file(sink, schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+
+    def _write_npz(self, path):
+        # Compressed panel slice: dates, tickers and one (dates x tickers) array per field,
+        # each array streamed into its own zip member
+        # Every column the frames carry, including per-window indicator columns such as
+        # SMA_5; the default indicators are only computed if the frames have none, in which
+        # case the bars they need to warm up are aligned too. Nothing else outside the range is
+        fields = list(dict.fromkeys(c for df in self.frames.values() for c in df.columns))
+        compute = not any(f.split('_')[0] in INDICATORS for f in fields)
+        since = warmup_start(self.start, DEFAULT_WINDOWS) if compute else self.start
+        panel = Panel.from_frames({t: df.loc[since:self.end] for t, df in self.frames.items()},
+                                  fields=fields)
+        if compute:
+            panel.compute_indicators()
+        lo = np.searchsorted(panel.dates, pd.Timestamp(self.start).value, side='left')
+        hi = np.searchsorted(panel.dates, (pd.Timestamp(self.end) + pd.Timedelta(days=1)).value,
+                             side='left')
+        arrays = {'Date': panel.dates[lo:hi].view('datetime64[ns]'),
+                  'Ticker': np.array(panel.tickers, dtype=str)}
+        arrays.update({f: a[lo:hi] for f, a in panel.fields.items()})
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, arr in arrays.items():
+                with zf.open(f"{name}.npy", 'w', force_zip64=True) as member:
+                    np.lib.format.write_array(member, np.ascontiguousarray(arr), allow_pickle=False)
+
+    @staticmethod
+    def _arrow():
+        # pyarrow is optional and only needed for the columnar binary formats
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise RuntimeError("Parquet and Feather export need pyarrow (pip install pyarrow)")
+        return pyarrow
+
+
+class HtmlDashboard:
+    # Interactive browser version of the charts, adapted from create_stock_figure in
+    # reference/visualizer.py: WebGL (Scattergl) traces at full resolution, every series
+    # sent as a base64 typed array, written as one self-contained HTML file
+    def __init__(self, series, bounds, windows=DEFAULT_WINDOWS, color_map=None,
+                 title="Stock Price Chart"):
+        self.series = series
+        self.bounds = bounds
+        self.windows = windows
+        self.color_map = color_map or {}
+        self.title = title
+
+    def write(self, path):
+        # Build the figure and write it with plotly.js inlined, so the file works offline
+        if not any(hi > lo for lo, hi in self.bounds.values()):
+            raise RuntimeError("No data in the selected range to export")
+        go = self._plotly()
+        with tracer.span('export', fmt='HTML', tickers=len(self.series)):
+            self.figure(go).write_html(path, include_plotlyjs=True, full_html=True)
+
+    def figure(self, go):
+        # Price with SMA/EMA overlays on top, volatility and volume in their own rows below
+        traces = []
+        for t, s in self.series.items():
+            lo, hi = self.bounds[t]
+            # Epoch milliseconds on a date axis keep x binary too
+            x = self._typed((s.dates[lo:hi] // 1_000_000).astype(np.float64))
+            color = self._color(t)
+            lines = [('Close', 'Close', None, 'y', 'solid'), ('Volume', 'Volume', None, 'y3', 'solid')]
+            for name, axis, dash in (('SMA', 'y', 'dot'), ('EMA', 'y', 'dash'), ('Volatility', 'y2', 'solid')):
+                lines += [(name, f"{name} {w}", w, axis, dash) for w in self.windows.get(name, [])]
+            for metric, label, w, axis, dash in lines:
+                values = s.columns[metric] if w is None else s.indicator(metric, [w])[w]
+                traces.append(go.Scattergl(x=x, y=self._typed(values[lo:hi]), mode='lines',
+                                           name=f"{t} {label}", legendgroup=t, yaxis=axis,
+                                           line=dict(color=color, dash=dash, width=1),
+                                           hovertemplate=f"%{{y:{HOVER_FORMATS[axis]}}}<br>%{{x}}<extra></extra>"))
+        fig = go.Figure(data=traces)
+        fig.update_layout(
+            title=self.title,
+            xaxis=dict(title='Date', type='date', rangeselector=dict(buttons=[
+                dict(count=1, label='1m', step='month', stepmode='backward'),
+                dict(count=6, label='6m', step='month', stepmode='backward'),
+                dict(count=1, label='YTD', step='year', stepmode='todate'),
+                dict(count=1, label='1y', step='year', stepmode='backward'),
+                dict(step='all')])),
+            yaxis=dict(title='Price', domain=[0.45, 1.0]),
+            yaxis2=dict(title='Volatility', domain=[0.23, 0.42]),
+            yaxis3=dict(title='Volume', domain=[0.0, 0.2]),
+            legend=dict(groupclick='toggleitem'),
+            hovermode='closest',
+            template='plotly_white',
+            margin=dict(l=50, r=80, t=50, b=50))
+        return fig
+
+    def _color(self, ticker):
+        # The ticker's matplotlib cycle color as hex, or Plotly's default when unassigned
+        color = self.color_map.get(ticker)
+        if color is None:
+            return None
+        return mcolors.to_hex(color)
+
+    @staticmethod
+    def _typed(values):
+        # Plotly typed array spec: raw little-endian bytes in base64 instead of a JSON number
+        # list, about 4x smaller for float32 and decoded without parsing
+        arr = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<'))
+        return {'dtype': {np.float32: 'f4', np.float64: 'f8'}[arr.dtype.type],
+                'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+
+    @staticmethod
+    def _plotly():
+        # Plotly is optional and only needed for the HTML dashboard; 6.0 added typed arrays
+        try:
+            import plotly.graph_objects as go
+        except ImportError:
+            raise RuntimeError("HTML export needs plotly 6 or newer (pip install plotly)")
+        return go
+
+
+def decimate_minmax(x, y, n_out):
+    # Reduce a series to about n_out points by keeping each bucket's min and max in time order
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return x, y
+    buckets = n_out // 2
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, size)
+    lo = np.argmin(np.where(np.isnan(rows), np.inf, rows), axis=1)
+    hi = np.argmax(np.where(np.isnan(rows), -np.inf, rows), axis=1)
+    base = np.arange(buckets) * size
+    idx = np.concatenate(([0, n - 1], base + lo, base + hi))
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+
+class MetricChart:
+    # One metric's figure with a persistent line artist per ticker (no Tk dependency)
+    def __init__(self, metric):
+        self.metric = metric
+        self.fig = plt.Figure(); self.fig.subplots_adjust(left=0.3)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_title(metric)
+        # Lines get x as matplotlib date numbers, which skips per-draw unit conversion
+        self.ax.xaxis_date()
+        self.lines = {}
+        self.legend_keys = ()
+        self.level = 'D'
+        # (ticker, window, level, lo, hi, width) -> (weakref to source series, x, y), least
+        # recently used first; the weakref lets evicted datasets be freed
+        self.decimated = OrderedDict()
+
+    def render(self, series, color_map, bounds, windows=None):
+        # Point existing artists at the new slice; only add or remove artists when the
+        # set of (ticker, window) lines changes
+        windows = (windows or DEFAULT_WINDOWS).get(self.metric, [None])
+        wanted = [(t, w) for t in series for w in windows]
+        for key in [k for k in self.lines if k not in wanted]:
+            self.lines.pop(key).remove()
+        width = max(int(self.ax.bbox.width), 1)
+        # Every line uses the finest level at which the longest one fits the axes width
+        budget = POINTS_PER_PIXEL * width
+        depth = max((s.lod(bounds[t], budget) for t, s in series.items()), default=0)
+        levels = {}
+        for t, s in series.items():
+            d = min(depth, len(s.levels))
+            levels[t] = s.level(d) + (s.level_bounds(bounds[t], d),)
+        level = next(iter(levels.values()))[0] if levels else 'D'
+        if level != self.level:
+            self.level = level
+            self.ax.set_title(self.metric if level == 'D' else f"{self.metric} ({LOD_NAMES[level]})")
+        for t, w in wanted:
+            x, y = self._series(t, w, *levels[t], width)
+            line = self.lines.get((t, w))
+            label = t if w is None else f"{t} {w}"
+            # A window's style follows its position, which shifts when windows are added
+            style = WINDOW_STYLES[windows.index(w) % len(WINDOW_STYLES)]
+            if line is None:
+                self.lines[(t, w)], = self.ax.plot(x, y, label=label, color=color_map[t],
+                                                   linestyle=style)
+            else:
+                line.set_data(x, y)
+                line.set_color(color_map[t])
+                line.set_linestyle(style)
+                line.set_label(label)
+        keys = tuple(wanted)
+        if keys != self.legend_keys:
+            self.legend_keys = keys
+            if keys:
+                self.ax.legend([self.lines[k] for k in keys], [self.lines[k].get_label() for k in keys],
+                               loc='center right', bbox_to_anchor=(-0.2, 0.5))
+            elif self.ax.get_legend() is not None:
+                self.ax.get_legend().remove()
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def _series(self, ticker, window, level, s, bounds, width):
+        # Slice and decimate one line to the axes width, reusing earlier results
+        key = (ticker, window, level, bounds, width)
+        hit = self.decimated.get(key)
+        if hit is not None and hit[0]() is s:
+            self.decimated.move_to_end(key)
+            return hit[1], hit[2]
+        lo, hi = bounds
+        values = s.columns[self.metric] if window is None else s.indicator(self.metric, [window])[window]
+        x, y = decimate_minmax(s.x[lo:hi], values[lo:hi], POINTS_PER_PIXEL * width)
+        self.decimated[key] = (weakref.ref(s), x, y)
+        if len(self.decimated) > DECIMATE_CACHE_SIZE:
+            self.decimated.popitem(last=False)
+        return x, y
+
+
+class CompareChart:
+    # Rebased returns, the correlation matrix and rolling correlation and beta against a
+    # benchmark. Each line panel is one LineCollection, so 100+ tickers stay a single artist
+    def __init__(self):
+        self.fig = plt.Figure()
+        (self.ax, self.ax_corr), (self.ax_rcorr, self.ax_beta) = self.fig.subplots(2, 2)
+        self.fig.subplots_adjust(left=0.08, right=0.95, hspace=0.35, wspace=0.3)
+        self.collections = {}
+        for ax in (self.ax, self.ax_rcorr, self.ax_beta):
+            locator = mdates.AutoDateLocator()
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+            self.collections[ax] = ax.add_collection(mcollections.LineCollection([], linewidths=1))
+        self.image = None
+        self.legend_keys = ()
+
+    def render(self, result, color_map):
+        # Replace every panel's data; an empty result clears them
+        if result is None:
+            for collection in self.collections.values():
+                collection.set_segments([])
+            if self.image is not None:
+                self.image.set_data(np.full((1, 1), np.nan))
+            return
+        others = [j for j, t in enumerate(result.tickers) if t != result.benchmark]
+        everyone = list(range(len(result.tickers)))
+        self._lines(self.ax, result, result.rebased, everyone, color_map)
+        self._lines(self.ax_rcorr, result, result.rolling_corr, others, color_map)
+        self._lines(self.ax_beta, result, result.rolling_beta, others, color_map)
+        self.ax.set_title("Return since start (%)")
+        self.ax_rcorr.set_title(f"{result.window}-bar correlation vs {result.benchmark}")
+        self.ax_beta.set_title(f"{result.window}-bar beta vs {result.benchmark}")
+        self._heatmap(result)
+        keys = tuple(result.tickers) if len(result.tickers) <= COMPARE_LEGEND_MAX else ()
+        if keys != self.legend_keys:
+            self.legend_keys = keys
+            if keys:
+                handles = [mlines.Line2D([], [], color=color_map[t]) for t in keys]
+                self.ax.legend(handles, keys, loc='upper left', fontsize='small')
+            elif self.ax.get_legend() is not None:
+                self.ax.get_legend().remove()
+
+    def _lines(self, ax, result, values, columns, color_map):
+        # Decimated, NaN-free segments for the given columns, with limits set by hand since
+        # relim() does not look at collections
+        budget = POINTS_PER_PIXEL * max(int(ax.bbox.width), 1)
+        segments, colors = [], []
+        for j in columns:
+            ok = ~np.isnan(values[:, j])
+            x, y = decimate_minmax(result.x[ok], values[ok, j], budget)
+            segments.append(np.column_stack([x, y]))
+            colors.append(color_map.get(result.tickers[j], 'C0'))
+        collection = self.collections[ax]
+        collection.set_segments(segments)
+        collection.set_color(colors)
+        ys = [seg[:, 1] for seg in segments if len(seg)]
+        if ys and len(result.x) > 1:
+            lo, hi = min(y.min() for y in ys), max(y.max() for y in ys)
+            pad = (hi - lo) * 0.05 or 1.0
+            ax.set_xlim(result.x[0], result.x[-1])
+            ax.set_ylim(lo - pad, hi + pad)
+
+    def _heatmap(self, result):
+        # Correlation matrix on a fixed -1..1 scale; tick labels only while they stay legible
+        n = len(result.tickers)
+        if self.image is None:
+            self.image = self.ax_corr.imshow(result.corr, vmin=-1, vmax=1, cmap='RdBu_r')
+            self.fig.colorbar(self.image, ax=self.ax_corr)
+        else:
+            self.image.set_data(result.corr)
+            self.image.set_extent((-0.5, n - 0.5, n - 0.5, -0.5))
+        labels = result.tickers if n <= COMPARE_LABEL_MAX else []
+        ticks = range(n) if labels else []
+        self.ax_corr.set_xticks(ticks, labels, rotation=90, fontsize='small')
+        self.ax_corr.set_yticks(ticks, labels, fontsize='small')
+        self.ax_corr.set_title("Return correlation")
+
+
+class LiveChart:
+    # Minute-bar close (solid) and SMA (dashed) per ticker, drawn straight from ring buffers
+    def __init__(self):
+        self.fig = plt.Figure(); self.fig.subplots_adjust(left=0.3)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_title('LIVE')
+        self.ax.xaxis_date()
+        self.lines = {}
+
+    def render(self, feed, color_map):
+        # Point each ticker's lines at its buffer view; nothing is copied or rebuilt per tick
+        tickers = feed.tickers if feed is not None else []
+        for t in [t for t in self.lines if t not in tickers]:
+            for line in self.lines.pop(t):
+                line.remove()
+        for t in tickers:
+            v = feed.buffers[t].view()
+            if t not in self.lines:
+                close, = self.ax.plot([], [], label=t, color=color_map[t])
+                sma, = self.ax.plot([], [], color=color_map[t], linestyle='--')
+                self.lines[t] = (close, sma)
+                self.ax.legend(loc='center right', bbox_to_anchor=(-0.2, 0.5))
+            close, sma = self.lines[t]
+            close.set_data(v[:, 0], v[:, 1])
+            sma.set_data(v[:, 0], v[:, 3])
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+
 class PlotManager:
     # Handles creation and updating of plot tabs
-    def __init__(self, notebook):
+    def __init__(self, notebook, compare=None):
         self.notebook = notebook
+        # compare(benchmark, window) -> Comparison or None, supplied by the controller
+        self.compare = compare
         self.tabs = {}
+        # Metric tabs whose chart is out of date, and the inputs to draw them from
+        self.dirty = set()
+        self.view = ({}, {}, {}, DEFAULT_WINDOWS)
+        self.live_view = (None, {})
+        # Chart tabs whose figure and canvas have not been built yet (done when first shown)
+        self.pending = set()
+        # Scheduled re-render after the chart canvases were resized
+        self.resize_id = None
         self._create_tabs()
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
 
     def _create_tabs(self):
         # Set up an INFO tab for text summaries
@@ -77,37 +1656,176 @@ class PlotManager:
         info_text.pack(fill='both', expand=True)
         self.tabs['INFO'] = {'frame': info_frame, 'widget': info_text}
         self.notebook.add(info_frame, text='INFO')
-        # Create a tab for each metric with its own matplotlib canvas
-        for metric in METRICS:
+        # One empty frame per metric chart, the cross-ticker comparison and the intraday
+        # chart fed by live mode; their figures are built by _build_chart when first opened
+        for name in METRICS + ['COMPARE', 'LIVE']:
             frame = ttk.Frame(self.notebook)
-            fig = plt.Figure(); fig.subplots_adjust(left=0.3)
-            ax = fig.add_subplot(111)
-            canvas = FigureCanvasTkAgg(fig, master=frame)
-            canvas.get_tk_widget().pack(fill='both', expand=True)
-            self.tabs[metric] = {'frame': frame, 'ax': ax, 'fig': fig, 'canvas': canvas}
-            self.notebook.add(frame, text=metric)
-
-    def update(self, infos, data_values, color_map, start, end):
-        # Refresh INFO tab with textual data
+            self.tabs[name] = {'frame': frame}
+            self.notebook.add(frame, text=name)
+            self.pending.add(name)
+        # Timing summary of the recorded spans, refreshed whenever the tab is shown
+        perf_frame = ttk.Frame(self.notebook)
+        perf_text = tk.Text(perf_frame, wrap='none', state='disabled', font='TkFixedFont')
+        perf_text.pack(fill='both', expand=True)
+        self.tabs['PERF'] = {'frame': perf_frame, 'widget': perf_text}
+        self.notebook.add(perf_frame, text='PERF')
+
+    def _build_chart(self, name):
+        # Create a chart tab's figure and Tk canvas (this is what loads matplotlib)
+        tab = self.tabs[name]
+        if name == 'COMPARE':
+            chart = CompareChart()
+            self._build_compare_controls(tab)
+        else:
+            chart = LiveChart() if name == 'LIVE' else MetricChart(name)
+        canvas = backend_tkagg.FigureCanvasTkAgg(chart.fig, master=tab['frame'])
+        widget = canvas.get_tk_widget()
+        widget.pack(fill='both', expand=True)
+        # Lines are decimated to the axes width, so a resize (including the first layout,
+        # which happens after the first render) redraws at the new size
+        widget.bind('<Configure>', lambda e, n=name: self._on_resize(n, e.width), add='+')
+        canvas.draw = self._timed_draw(canvas.draw, name)
+        tab.update({'ax': chart.ax, 'fig': chart.fig, 'canvas': canvas, 'chart': chart})
+        self.pending.discard(name)
+
+    def _build_compare_controls(self, tab):
+        # Benchmark picker and rolling window entry above the COMPARE chart
+        bar = ttk.Frame(tab['frame'])
+        bar.pack(side='top', fill='x')
+        benchmark_var = tk.StringVar()
+        window_var = tk.StringVar(value=str(COMPARE_WINDOW))
+        combo = ttk.Combobox(bar, textvariable=benchmark_var, state='readonly', width=8)
+        entry = ttk.Entry(bar, textvariable=window_var, width=5)
+        ttk.Label(bar, text="Benchmark:").pack(side='left')
+        combo.pack(side='left', padx=5)
+        ttk.Label(bar, text="Rolling window:").pack(side='left', padx=(10, 0))
+        entry.pack(side='left', padx=5)
+        combo.bind('<<ComboboxSelected>>', lambda e: self._on_compare_change())
+        entry.bind('<Return>', lambda e: self._on_compare_change())
+        entry.bind('<FocusOut>', lambda e: self._on_compare_change())
+        tab.update({'benchmark': benchmark_var, 'window': window_var, 'combo': combo})
+
+    def _on_compare_change(self):
+        # Benchmark or window edited: recompute the comparison
+        self.dirty.add('COMPARE')
+        self._render_visible()
+
+    def _comparison(self):
+        # Read the COMPARE controls, falling back to the first ticker and the default window,
+        # and ask the controller for the matching result
+        tab = self.tabs['COMPARE']
+        tickers = list(self.view[0])
+        tab['combo'].config(values=tickers)
+        if not tickers or self.compare is None:
+            return None
+        benchmark = tab['benchmark'].get()
+        if benchmark not in tickers:
+            benchmark = tickers[0]
+            tab['benchmark'].set(benchmark)
+        try:
+            window = int(tab['window'].get())
+        except ValueError:
+            window = 0
+        if window < 2:
+            window = COMPARE_WINDOW
+            tab['window'].set(str(window))
+        return self.compare(benchmark, window)
+
+    def _on_resize(self, name, width):
+        # Mark a resized chart stale and re-render once the burst of resize events settles
+        tab = self.tabs[name]
+        if tab.get('width') == width:
+            return
+        tab['width'] = width
+        self.dirty.add(name)
+        if self.resize_id is None:
+            self.resize_id = tab['canvas'].get_tk_widget().after(REDRAW_MS, self._after_resize)
+
+    def _after_resize(self):
+        # Redraw the visible chart at its new size; other resized tabs redraw when shown
+        self.resize_id = None
+        self._render_visible()
+
+    def figure(self, name):
+        # A chart tab's figure, built first if the tab has never been opened
+        if name in self.pending:
+            self._build_chart(name)
+        return self.tabs[name]['fig']
+
+    @staticmethod
+    def _timed_draw(draw, tab):
+        # Wrap a canvas's draw so the deferred Agg render and blit show up as 'draw' spans
+        def timed(*args, **kwargs):
+            with tracer.span('draw', tab=tab):
+                return draw(*args, **kwargs)
+        return timed
+
+    def update(self, series, color_map, bounds, windows=DEFAULT_WINDOWS):
+        # Compute any newly selected windows in one pass per indicator, then mark every
+        # chart stale but only redraw the one on screen
+        for s in series.values():
+            for name, ws in windows.items():
+                s.indicator(name, ws)
+        self.view = (series, color_map, bounds, windows)
+        self.dirty |= set(METRICS) | {'COMPARE'}
+        self._render_visible()
+
+    def update_info(self, infos):
+        # Replace the INFO tab text; charts are left alone
         widget = self.tabs['INFO']['widget']
         widget.config(state='normal')
         widget.delete('1.0', tk.END)
         widget.insert(tk.END, ''.join(infos))
         widget.config(state='disabled')
-        # Redraw each metric's chart with the new data slice
-        for metric, tab in self.tabs.items():
-            if metric == 'INFO':
-                continue
-            ax = tab['ax']
-            ax.clear()
-            for t, df in data_values.items():
-                sl = df.loc[start:end]
-                if sl.empty:
-                    sl = df
-                ax.plot(sl.index, sl[metric], label=t, color=color_map[t])
-            ax.set_title(metric)
-            ax.legend(loc='center right', bbox_to_anchor=(-0.2, 0.5))
-            tab['canvas'].draw()
+
+    def push_live(self, feed, color_map):
+        # New minute bars arrived: redraw the LIVE chart now if shown, otherwise when opened
+        self.live_view = (feed, color_map)
+        self.dirty.add('LIVE')
+        self._render_visible()
+
+    def current_tab(self):
+        # Name of the notebook tab currently shown
+        return self.notebook.tab(self.notebook.select(), 'text')
+
+    def _on_tab_changed(self, event):
+        # Draw a stale chart the first time its tab is shown after a change
+        self._render_visible()
+
+    def _render_visible(self):
+        # Redraw the visible chart if its data changed since it was last drawn
+        metric = self.current_tab()
+        if metric == 'PERF':
+            self.show_perf()
+            return
+        if metric in self.pending:
+            self._build_chart(metric)
+        if metric in self.dirty:
+            self._render(metric)
+
+    def show_perf(self):
+        # Replace the PERF tab text with the current span summary
+        widget = self.tabs['PERF']['widget']
+        widget.config(state='normal')
+        widget.delete('1.0', tk.END)
+        if tracer.enabled or tracer.spans:
+            widget.insert(tk.END, tracer.summary())
+        else:
+            widget.insert(tk.END, "Tracing is off. Tick 'Trace' to record timing spans.\n")
+        widget.config(state='disabled')
+
+    def _render(self, metric):
+        # Update one metric's chart with the current data slice and let Tk repaint when idle
+        tab = self.tabs[metric]
+        with tracer.span('render', tab=metric):
+            if metric == 'LIVE':
+                tab['chart'].render(*self.live_view)
+            elif metric == 'COMPARE':
+                tab['chart'].render(self._comparison(), self.view[1])
+            else:
+                tab['chart'].render(*self.view)
+        tab['canvas'].draw_idle()
+        self.dirty.discard(metric)
 
 
 class GUIManager:
@@ -143,19 +1861,33 @@ class GUIManager:
         self.ticker_vars = []
         self._add_ticker()
         self.date_frame = ttk.Frame(self.root)
-        self.start_cal = DateEntry(self.date_frame, width=12,
-                                   mindate=MIN_DATE,
-                                   maxdate=TODAY - timedelta(days=MIN_SPAN_DAYS))
-        self.end_cal = DateEntry(self.date_frame, width=12,
-                                 mindate=MIN_DATE,
-                                 maxdate=TODAY)
+        self.start_cal = tkcalendar.DateEntry(self.date_frame, width=12,
+                                              mindate=MIN_DATE,
+                                              maxdate=TODAY - timedelta(days=MIN_SPAN_DAYS))
+        self.end_cal = tkcalendar.DateEntry(self.date_frame, width=12,
+                                            mindate=MIN_DATE,
+                                            maxdate=TODAY)
         self.start_cal.set_date(TODAY - timedelta(days=MIN_SPAN_DAYS))
         self.end_cal.set_date(TODAY)
+        self.window_vars = {name: tk.StringVar(value=', '.join(map(str, ws)))
+                            for name, ws in DEFAULT_WINDOWS.items()}
+        self.window_entries = {name: ttk.Entry(self.date_frame, textvariable=var, width=12)
+                               for name, var in self.window_vars.items()}
         self.ctrl_frame = ttk.Frame(self.root)
         self.fetch_btn = ttk.Button(self.ctrl_frame, text="Fetch", command=self.ctrl.on_fetch)
+        self.cancel_btn = ttk.Button(self.ctrl_frame, text="Cancel", command=self.ctrl.on_cancel,
+                                     state='disabled')
+        self.progress = ttk.Progressbar(self.ctrl_frame, mode='determinate', length=160)
+        self.live_var = tk.BooleanVar(value=False)
+        self.live_chk = ttk.Checkbutton(self.ctrl_frame, text="Live", variable=self.live_var,
+                                        command=self.ctrl.on_live_toggle)
+        self.trace_var = tk.BooleanVar(value=tracer.enabled)
+        self.trace_chk = ttk.Checkbutton(self.ctrl_frame, text="Trace", variable=self.trace_var,
+                                         command=self.ctrl.on_trace_toggle)
+        self.memory_lbl = ttk.Label(self.ctrl_frame, text="")
         self.export_combo = ttk.Combobox(self.ctrl_frame,
-                                         values=["CSV", "Excel", "JSON", "PNG", "PDF"],
-                                         state="readonly", width=6)
+                                         values=DATA_FORMATS + ["PNG", "PDF", "HTML", "Trace"],
+                                         state="readonly", width=8)
         self.export_combo.current(0)
         self.export_btn = ttk.Button(self.ctrl_frame, text="Export", command=self.ctrl.on_export)
         self.notebook = ttk.Notebook(self.root)
@@ -168,10 +1900,18 @@ class GUIManager:
         self.start_cal.pack(side='left', padx=5)
         ttk.Label(self.date_frame, text="End Date:").pack(side='left')
         self.end_cal.pack(side='left', padx=5)
+        for name, entry in self.window_entries.items():
+            ttk.Label(self.date_frame, text=f"{name} windows:").pack(side='left', padx=(10, 0))
+            entry.pack(side='left', padx=5)
         self.date_frame.grid(row=2, column=0, columnspan=4, sticky='w', padx=10)
         self.fetch_btn.pack(side='left')
         self.export_combo.pack(side='left', padx=5)
         self.export_btn.pack(side='left')
+        self.cancel_btn.pack(side='left', padx=(15, 5))
+        self.progress.pack(side='left')
+        self.live_chk.pack(side='left', padx=(15, 0))
+        self.trace_chk.pack(side='left', padx=(5, 0))
+        self.memory_lbl.pack(side='left', padx=(15, 0))
         self.ctrl_frame.grid(row=3, column=0, columnspan=4, sticky='w', padx=10, pady=5)
         self.notebook.grid(row=4, column=0, columnspan=4, sticky='nsew', padx=10, pady=5)
 
@@ -200,6 +1940,10 @@ class GUIManager:
         for cal in (self.start_cal, self.end_cal):
             cal.bind('<Button-1>', lambda e, c=cal: c.drop_down())
             cal.bind('<<DateEntrySelected>>', lambda e: self.ctrl.on_date_change(e))
+        # Apply indicator windows when the user confirms or leaves an entry
+        for entry in self.window_entries.values():
+            entry.bind('<Return>', lambda e: self.ctrl.on_windows_change())
+            entry.bind('<FocusOut>', lambda e: self.ctrl.on_windows_change())
 
     def get_tickers(self):
         # Return list of cleaned ticker symbols
@@ -210,19 +1954,65 @@ class GUIManager:
         return (self.start_cal.get_date().strftime('%Y-%m-%d'),
                 self.end_cal.get_date().strftime('%Y-%m-%d'))
 
+    def get_indicator_windows(self):
+        # Parse the window entries into {indicator: sorted windows}; raises ValueError if invalid
+        return {name: parse_windows(name, var.get()) for name, var in self.window_vars.items()}
+
     def get_export_format(self):
         # Return currently selected export format
         return self.export_combo.get()
 
+    def start_progress(self, total):
+        # Reset the progress bar for a fetch of `total` tickers
+        self.progress.config(maximum=max(total, 1), value=0)
+        self.cancel_btn.config(state='normal')
+
+    def step_progress(self):
+        # Advance the progress bar by one finished ticker
+        self.progress.step(1)
+
+    def stop_progress(self):
+        # Return progress controls to their idle state
+        self.progress.config(value=0)
+        self.cancel_btn.config(state='disabled')
+
+    def show_memory(self, nbytes, count, budget):
+        # Report what the dataset manager holds against its budget
+        self.memory_lbl.config(text=f"{count} held, {nbytes / 2 ** 20:.1f} / {budget / 2 ** 20:.0f} MB")
+
 
 class StockApp:
     # Orchestrates data, GUI, and plotting components
     def __init__(self, root):
+        self.root = root
         self.data_handler = DataHandler()
         self.gui = GUIManager(root, self)
-        self.plot_mgr = PlotManager(self.gui.notebook)
+        self.plot_mgr = PlotManager(self.gui.notebook, compare=self._compare)
         self.infos = []
         self.color_map = {}
+        self.windows = dict(DEFAULT_WINDOWS)
+        # Background fetch state: each fetch gets a generation so stale results are dropped
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.results = queue.Queue()
+        self.generation = 0
+        self.cancel_event = threading.Event()
+        self.fetch_tickers = []
+        self.fetch_texts = {}
+        self.fetch_since = None
+        self.fetching = False
+        self.revalidating = False
+        self.poll_id = None
+        # Pending coalesced redraw, whether it should also load a wider range, and the INFO
+        # text last shown
+        self.redraw_id = None
+        self.expand_pending = False
+        self.shown_infos = None
+        # Live mode: the active feed and the pending root.after id for its next tick
+        self.live = None
+        self.live_id = None
+        root.protocol('WM_DELETE_WINDOW', self.on_close)
+        # The window is up before pandas, matplotlib and yfinance load; load them now off the Tk thread
+        self.executor.submit(self.data_handler.warm)
 
     def on_add_ticker(self):
         # Delegate to GUI to add a ticker field
@@ -245,19 +2035,223 @@ class StockApp:
             max_start = end_date - timedelta(days=MIN_SPAN_DAYS)
             if start_date > max_start:
                 self.gui.start_cal.set_date(max_start)
-        if self.data_handler.data:
-            start, end = self.gui.get_date_range()
-            self.plot_mgr.update(self.infos, self.data_handler.data, self.color_map, start, end)
+        if self.data_handler.data or self.fetching:
+            self._request_redraw(expand=True)
+
+    def _expand_range(self):
+        # Fetch, in the background, the leading bars that the selected range and windows
+        # need but the loaded tickers do not hold yet; nothing else is refetched
+        if self.fetching:
+            # Retried when the running fetch is done
+            self.expand_pending = True
+            return
+        since = warmup_start(self.gui.get_date_range()[0], self.windows)
+        tickers = self.data_handler.uncovered(since)
+        if tickers:
+            self._start_fetch(tickers, since)
+
+    def on_windows_change(self):
+        # Apply a new indicator window selection; only missing windows get computed
+        try:
+            windows = self.gui.get_indicator_windows()
+        except ValueError as e:
+            messagebox.showwarning("Indicator Windows", str(e))
+            return
+        if windows != self.windows:
+            self.windows = windows
+            if self.data_handler.data:
+                self._request_redraw(expand=True)
 
     def on_fetch(self):
-        # Fetch data for entered tickers and update plots
+        # Start a background fetch for entered tickers; it replaces any fetch in flight
         tickers = self.gui.get_tickers()
         if not tickers:
             messagebox.showwarning("No Tickers", "Enter at least one ticker.")
             return
-        self.infos, self.color_map = self.data_handler.fetch(tickers)
+        self.fetch_tickers = tickers
+        self.fetch_texts = {}
+        self.infos = []
+        self.color_map = self.data_handler.color_map(tickers)
+        self.data_handler.clear()
+        # Only the selected range is loaded, plus the bars that warm up the indicators
+        self._start_fetch(tickers, warmup_start(self.gui.get_date_range()[0], self.windows))
+        if self.live is not None:
+            self._start_live(tickers)
+
+    def _start_fetch(self, tickers, since):
+        # Load tickers from `since` in the background; results replace any fetch in flight
+        self.cancel_event.set()
+        self.generation += 1
+        self.cancel_event = threading.Event()
+        self.fetch_since = since
+        self.gui.start_progress(len(tickers))
+        self.fetching = True
+        self.revalidating = True
+        self.executor.submit(self._run_fetch, self.generation, tickers, self.cancel_event, since)
+        if self.poll_id is None:
+            self.poll_id = self.root.after(POLL_MS, self._poll_results)
+
+    def on_live_toggle(self):
+        # Start or stop polling minute bars for the entered tickers
+        if not self.gui.live_var.get():
+            self._stop_live()
+            return
+        tickers = self.gui.get_tickers()
+        if not tickers:
+            self.gui.live_var.set(False)
+            messagebox.showwarning("No Tickers", "Enter at least one ticker.")
+            return
+        self._start_live(tickers)
+
+    def _start_live(self, tickers):
+        # Replace any running feed with a fresh one and poll it right away
+        self._stop_live()
+        self.live = LiveFeed(tickers, self.data_handler)
+        self._live_tick()
+
+    def _stop_live(self):
+        # Drop the feed; a poll already in flight is ignored when it lands
+        if self.live_id is not None:
+            self.root.after_cancel(self.live_id)
+            self.live_id = None
+        self.live = None
+
+    def _live_tick(self):
+        # Poll the feed on the executor so the network wait never blocks Tk
+        self.live_id = None
+        if self.live is not None:
+            self._await_live(self.live, self.executor.submit(self.live.poll))
+
+    def _await_live(self, feed, fut):
+        # Runs on the Tk thread until the poll finishes, then pushes new bars to the chart
+        if feed is not self.live:
+            return
+        if not fut.done():
+            self.live_id = self.root.after(POLL_MS, lambda: self._await_live(feed, fut))
+            return
+        if fut.exception() is None and any(fut.result().values()):
+            self.plot_mgr.push_live(feed, self.data_handler.color_map(feed.tickers))
+        self.live_id = self.root.after(LIVE_POLL_MS, self._live_tick)
+
+    def on_trace_toggle(self):
+        # Switch timing spans on or off; spans already recorded are kept
+        tracer.enabled = self.gui.trace_var.get()
+        if self.plot_mgr.current_tab() == 'PERF':
+            self.plot_mgr.show_perf()
+
+    def on_cancel(self):
+        # Abandon the fetch in flight, keeping whatever tickers already arrived
+        self.cancel_event.set()
+        self.generation += 1
+        self.fetching = False
+        self.revalidating = False
+        self.gui.stop_progress()
+
+    def on_close(self):
+        # Stop background work before tearing down the window
+        if self.redraw_id is not None:
+            self.root.after_cancel(self.redraw_id)
+        self._stop_live()
+        self.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    def _run_fetch(self, generation, tickers, cancel, since):
+        # Runs on the executor: post each ticker's result to the queue as it completes
+        try:
+            for t, df, text in self.data_handler.stream(tickers, cancel, since):
+                self.results.put((generation, 'ticker', (t, df, text)))
+        except Exception as e:
+            self.results.put((generation, 'error', e))
+        self.results.put((generation, 'done', None))
+        if cancel.is_set():
+            # Cancelled or replaced: nobody wants its fundamentals refreshed
+            return
+        # Fundamentals shown from a stale cache entry are refreshed quietly afterwards
+        try:
+            for t, text in self.data_handler.revalidate(tickers, cancel):
+                self.results.put((generation, 'info', (t, text)))
+        except Exception:
+            pass
+        self.results.put((generation, 'revalidated', None))
+
+    def _poll_results(self):
+        # Runs on the Tk thread: apply queued results and redraw with each new ticker
+        self.poll_id = None
+        changed = info_changed = done = False
+        while True:
+            try:
+                generation, kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                continue
+            if kind == 'ticker':
+                t, df, text = payload
+                if df is not None:
+                    self.data_handler.add(t, df, self.fetch_since)
+                self.fetch_texts[t] = text
+                self.gui.step_progress()
+                changed = True
+            elif kind == 'info':
+                t, text = payload
+                if t in self.data_handler.data:
+                    self.fetch_texts[t] = text
+                    info_changed = True
+            elif kind == 'error':
+                messagebox.showerror('Fetch', f'Fetch failed: {payload}')
+            elif kind == 'done':
+                self.fetching = False
+                self.gui.stop_progress()
+                done = True
+            else:
+                self.revalidating = False
+        if changed or info_changed:
+            self.infos = [self.fetch_texts[t] for t in self.fetch_tickers if t in self.fetch_texts]
+        if changed:
+            self._request_redraw()
+        elif info_changed:
+            self._show_infos()
+        if done and self.expand_pending and not changed:
+            # A range widened while the fetch ran: load it now (a pending redraw does this)
+            self.expand_pending = False
+            self._expand_range()
+        if (self.fetching or self.revalidating) and self.poll_id is None:
+            self.poll_id = self.root.after(POLL_MS, self._poll_results)
+
+    def _request_redraw(self, expand=False):
+        # Coalesce redraws: the first request schedules one render REDRAW_MS later and any
+        # that arrive before it runs (calendar clamping, fast clicking, a burst of fetch
+        # results) only add to the pending state. `expand` also loads any missing range
+        self.expand_pending |= expand
+        if self.redraw_id is None:
+            self.redraw_id = self.root.after(REDRAW_MS, self._redraw)
+
+    def _redraw(self):
+        # Resolve the selected range once and hand the charts integer bounds
+        self.redraw_id = None
         start, end = self.gui.get_date_range()
-        self.plot_mgr.update(self.infos, self.data_handler.data, self.color_map, start, end)
+        bounds = self.data_handler.bounds(start, end)
+        self._show_infos()
+        # The charts keep this view until the next redraw, so hand them a snapshot that
+        # matches `bounds`; tickers added meanwhile wait for the redraw already scheduled
+        self.plot_mgr.update(dict(self.data_handler.series), self.color_map, bounds, self.windows)
+        datasets = self.data_handler.datasets
+        self.gui.show_memory(*datasets.footprint(), datasets.budget)
+        if self.expand_pending:
+            self.expand_pending = False
+            self._expand_range()
+
+    def _show_infos(self):
+        # Rebuild the INFO text only if it differs from what is on screen
+        if self.infos != self.shown_infos:
+            self.plot_mgr.update_info(self.infos)
+            self.shown_infos = list(self.infos)
+
+    def _compare(self, benchmark, window):
+        # COMPARE tab source: every loaded ticker over the selected range
+        start, end = self.gui.get_date_range()
+        return self.data_handler.compare(start, end, benchmark, window)
 
     def on_export(self):
         # Export current data or chart in selected format
@@ -267,34 +2261,119 @@ class StockApp:
         filename = f"{datetime.now():%Y%m%d}-{start.replace('-', '')}-{end.replace('-', '')}[{'-'.join(ticks)}]"
         out_dir = os.path.join(os.path.dirname(__file__), 'export')
         os.makedirs(out_dir, exist_ok=True)
-        path = os.path.join(out_dir, f"{filename}.{fmt.lower()}")
-        if fmt == 'JSON':
-            data_out = {
-                t: df.reset_index().rename(columns={df.index.name: 'Date'})
-                       .assign(Date=lambda x: x['Date'].dt.strftime('%Y-%m-%d'))
-                       .to_dict(orient='records')
-                for t, df in self.data_handler.data.items()
-            }
-            with open(path, 'w') as f:
-                json.dump(data_out, f, indent=4)
-        elif fmt == 'CSV':
-            pd.concat(self.data_handler.data, names=['Ticker','Date']).to_csv(path)
-        elif fmt == 'Excel':
-            with pd.ExcelWriter(path) as writer:
-                for t, df in self.data_handler.data.items():
-                    df.to_excel(writer, sheet_name=t)
+        path = os.path.join(out_dir, f"{filename}.{EXPORT_EXTENSIONS[fmt]}")
+        if fmt in DATA_FORMATS:
+            # Only the selected range is written, streamed straight to the file from the
+            # full-precision cached bars, cut to the range as each ticker is read
+            try:
+                DataExporter(self.data_handler.export_frames(start, end), start, end).write(fmt, path)
+            except (RuntimeError, OSError) as e:
+                messagebox.showerror('Export', str(e))
+                return
+        elif fmt == 'HTML':
+            # Full-resolution WebGL dashboard of every loaded ticker for the browser
+            bounds = self.data_handler.bounds(start, end)
+            try:
+                HtmlDashboard(self.data_handler.series, bounds, self.windows, self.color_map,
+                              title=f"{', '.join(ticks)} {start} to {end}").write(path)
+            except RuntimeError as e:
+                messagebox.showerror('Export', str(e))
+                return
+        elif fmt == 'Trace':
+            # Chrome trace of the recorded spans, for chrome://tracing or Perfetto
+            tracer.dump(path)
         else:
-            current = self.gui.notebook.tab(self.gui.notebook.select(), 'text')
-            if current == 'INFO':
-                widget = self.plot_mgr.tabs['INFO']['widget']
+            current = self.plot_mgr.current_tab()
+            if current in ('INFO', 'PERF'):
+                widget = self.plot_mgr.tabs[current]['widget']
                 with open(path, 'w') as f:
                     f.write(widget.get('1.0', tk.END))
             else:
-                self.plot_mgr.tabs[current]['fig'].savefig(path)
+                self.plot_mgr.figure(current).savefig(path)
         messagebox.showinfo('Export', f'Data exported to {path}')
 
 
+def _batch_job(ticker, start, end, windows, fmt, out_dir, cache_dir):
+    # Process-pool task: refresh one ticker through the cache from just early enough that
+    # its windows are warm at `start`, add indicators, then write it or hand back the range
+    handler = DataHandler(store=HistoryStore(cache_dir), workers=1)
+    df = handler._load_history(ticker, warmup_start(start, windows))
+    if df is None or df.empty:
+        raise RuntimeError(f"No data for {ticker}")
+    df = DataHandler.with_indicators(df, windows).loc[start:end]
+    if out_dir is None:
+        return len(df), df
+    path = os.path.join(out_dir, f"{safe_name(ticker)}.{EXPORT_EXTENSIONS[fmt]}")
+    DataExporter({ticker: df}, start, end).write(fmt, path)
+    return len(df), None
+
+
+def read_ticker_file(path):
+    # One or more tickers per line, separated by commas or spaces; '#' starts a comment
+    with open(path) as f:
+        text = ' '.join(line.split('#', 1)[0] for line in f)
+    tickers = [t.strip().upper() for t in text.replace(',', ' ').split()]
+    return list(dict.fromkeys(tickers))
+
+
+def run_batch(args):
+    # Headless pipeline: fan tickers out over a process pool and write per-ticker or merged output
+    tickers = read_ticker_file(args.tickers)
+    windows = parse_indicator_spec(args.indicators)
+    os.makedirs(args.out, exist_ok=True)
+    frames, failed = {}, []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = {pool.submit(_batch_job, t, args.start, args.end, windows, args.format,
+                            None if args.merged else args.out, args.cache): t for t in tickers}
+        for fut in as_completed(jobs):
+            t = jobs[fut]
+            try:
+                rows, df = fut.result()
+            except Exception as e:
+                failed.append(t)
+                print(f"FAIL {t}: {e}", file=sys.stderr)
+                continue
+            if df is not None:
+                frames[t] = df
+            print(f"ok   {t} ({rows} rows)")
+    if args.merged and frames:
+        path = os.path.join(args.out, f"batch-{args.start.replace('-', '')}-{args.end.replace('-', '')}"
+                                      f".{EXPORT_EXTENSIONS[args.format]}")
+        DataExporter({t: frames[t] for t in tickers if t in frames}, args.start, args.end).write(args.format, path)
+        print(f"wrote {path}")
+    print(f"{len(tickers) - len(failed)}/{len(tickers)} tickers done")
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    # Command-line options; with no --batch the GUI starts as before
+    parser = argparse.ArgumentParser(description="Stock Data Viewer")
+    parser.add_argument('--batch', action='store_true', help="run headless instead of opening the GUI")
+    parser.add_argument('--tickers', help="file listing ticker symbols (batch mode)")
+    parser.add_argument('--start', default=(TODAY - timedelta(days=MIN_SPAN_DAYS)).isoformat())
+    parser.add_argument('--end', default=TODAY.isoformat())
+    parser.add_argument('--indicators', default='SMA=20;EMA=20;Volatility=20',
+                        help="indicator spec, e.g. 'SMA=5,20,50,200;EMA=12,26;Volatility=20'")
+    parser.add_argument('--format', default='Parquet', choices=DATA_FORMATS)
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export'))
+    parser.add_argument('--merged', action='store_true', help="write one merged file instead of one per ticker")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument('--cache', default=CACHE_DIR, help="history cache directory")
+    args = parser.parse_args(argv)
+    if args.batch and not args.tickers:
+        parser.error("--batch needs --tickers FILE")
+    if args.batch:
+        try:
+            parse_indicator_spec(args.indicators)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
 if __name__ == '__main__':
+    args = parse_args()
+    if args.batch:
+        sys.exit(run_batch(args))
     # Entry point: create the main window and run the app
     root = tk.Tk()
     app = StockApp(root)
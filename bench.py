@@ -0,0 +1,388 @@
+# Benchmarks for the Stock Data Viewer data pipeline.
+# Runs entirely offline against a fake provider that mimics yfinance with artificial latency
+# and injected errors.
+# Usage: python bench.py [--tickers N] [--latency SECONDS] [--errors RATE] [--json OUT] [--baseline OLD]
+
+import gc
+import os
+import sys
+import json
+import platform
+import argparse
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from app import (DataExporter, DataHandler, HistoryStore, HtmlDashboard, IndicatorEngine, LiveFeed,
+                 MetricChart, Panel,
+                 TickerSeries, DATA_FORMATS, DEFAULT_WINDOWS, EXPORT_EXTENSIONS, FETCH_WORKERS, METRICS,
+                 parse_indicator_spec, warmup_start)
+
+
+class FakeProvider:
+    # Deterministic stand-in for YFinanceProvider that sleeps to simulate round trips and
+    # fails a seeded fraction of calls, so the retry path is exercised too
+    host = 'fake.local'
+
+    def __init__(self, latency=0.2, years=25, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.years = years
+        self.error_rate = error_rate
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _round_trip(self, ticker):
+        # Simulated network wait, then an injected failure for error_rate of the calls
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+            failed = self.rng.random() < self.error_rate
+            self.errors += failed
+        if failed:
+            raise ConnectionError(f"injected failure for {ticker}")
+
+    def history(self, ticker, period=None, start=None, end=None, **kwargs):
+        self._round_trip(ticker)
+        df = synthetic_ohlcv(ticker, self.years)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
+
+    def info(self, ticker):
+        self._round_trip(ticker)
+        return {'longName': f"{ticker} Corp", 'sector': 'Synthetic'}
+
+
+class ReplayProvider:
+    # Fake live feed: replays recorded minute bars, revealing one more bar per ticker on each step()
+    host = 'replay.local'
+
+    def __init__(self, bars):
+        # Keep plain arrays so replayed slices never hold references back into the recording
+        self.bars = {t: (df.index.values, {c: df[c].to_numpy() for c in df.columns}) for t, df in bars.items()}
+        self.clock = 0
+
+    @classmethod
+    def from_csv(cls, path):
+        # Load recorded bars from a CSV with Ticker, Datetime and OHLCV columns
+        df = pd.read_csv(path, parse_dates=['Datetime'], index_col='Datetime')
+        return cls({t: g.drop(columns='Ticker') for t, g in df.groupby('Ticker')})
+
+    def step(self, n=1):
+        self.clock += n
+
+    def history(self, ticker, period=None, start=None, interval='1m', **kwargs):
+        index, columns = self.bars[ticker]
+        hi = min(self.clock, len(index))
+        if start is not None:
+            lo = index.searchsorted(np.datetime64(pd.Timestamp(start)))
+        elif period == '1d' and hi:
+            lo = index.searchsorted(index[hi - 1].astype('datetime64[D]'))
+        else:
+            lo = 0
+        return pd.DataFrame({c: v[lo:hi].copy() for c, v in columns.items()},
+                            index=pd.DatetimeIndex(index[lo:hi].copy(), name='Datetime'))
+
+    def info(self, ticker):
+        return {}
+
+
+def synthetic_minutes(ticker, days=20):
+    # Regular-session minute bars (390 per day) as a deterministic random walk
+    seed = sum(ord(c) * 17 ** i for i, c in enumerate(ticker)) % (2 ** 32)
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(d + pd.Timedelta(hours=9, minutes=30), periods=390, freq='min').values
+        for d in sessions]), name='Datetime')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, len(index))))
+    return pd.DataFrame({'Open': close, 'High': close * 1.0005, 'Low': close * 0.9995,
+                         'Close': close, 'Volume': rng.integers(1_000, 50_000, len(index))},
+                        index=index)
+
+
+def synthetic_ohlcv(ticker, years=25):
+    # Random-walk daily bars seeded by the ticker name so every run sees the same data
+    seed = sum(ord(c) * 31 ** i for i, c in enumerate(ticker)) % (2 ** 32)
+    rng = np.random.default_rng(seed)
+    days = np.arange(np.datetime64('today') - 366 * years, np.datetime64('today') + 1)
+    days = days[np.is_busday(days)][-252 * years:]
+    index = pd.DatetimeIndex(days.astype('datetime64[ns]'), name='Date')
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+    spread = np.abs(rng.normal(0, 0.01, len(index))) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.3, len(index)) * spread,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(100_000, 5_000_000, len(index)),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+
+def synthetic_universe(n_tickers, years, prefix='T'):
+    # N tickers x M years of synthetic daily bars with the default indicators attached
+    frames = {}
+    for i in range(n_tickers):
+        df = DataHandler._normalize(synthetic_ohlcv(f"{prefix}{i:03d}", years))
+        IndicatorEngine.compute(df)
+        frames[f"{prefix}{i:03d}"] = df
+    return frames
+
+
+def bench_fetch(tickers, latency, error_rate=0.0):
+    # Time a cold fetch sequentially, with the parallel worker pool, and (if error_rate)
+    # in parallel against a provider that fails some calls; then warm refetches from the
+    # disk cache and from the datasets held in memory
+    results = {}
+    scenarios = [('sequential', 1, 0.0), ('parallel', FETCH_WORKERS, 0.0)]
+    if error_rate:
+        scenarios.append(('errors', FETCH_WORKERS, error_rate))
+    handlers = {}
+    for label, workers, rate in scenarios:
+        handlers[label] = DataHandler(store=HistoryStore(tempfile.mkdtemp()),
+                                      provider=FakeProvider(latency, error_rate=rate), workers=workers)
+        t0 = time.perf_counter()
+        handlers[label].fetch(tickers)
+        results[label] = time.perf_counter() - t0
+    # Warm refetch through the on-disk cache and incremental refresh: a new handler shares
+    # the store and provider but starts with no datasets held in memory
+    parallel = handlers['parallel']
+    warm = DataHandler(store=parallel.store, provider=parallel.provider, workers=FETCH_WORKERS)
+    t0 = time.perf_counter()
+    warm.fetch(tickers)
+    results['cached'] = time.perf_counter() - t0
+    # Refetch of tickers the first handler still holds, served from its DatasetManager
+    t0 = time.perf_counter()
+    parallel.fetch(tickers)
+    results['held'] = time.perf_counter() - t0
+    # The GUI's default view: the last week plus indicator warm-up, into an empty cache
+    handler = DataHandler(store=HistoryStore(tempfile.mkdtemp()), provider=FakeProvider(latency))
+    t0 = time.perf_counter()
+    handler.fetch(tickers, warmup_start(pd.Timestamp.today().normalize() - pd.Timedelta(days=7),
+                                        DEFAULT_WINDOWS))
+    results['week'] = time.perf_counter() - t0
+    return results
+
+
+def bench_render(n_tickers, years, frames=10, metric='Close'):
+    # Mean frame time for range changes: legacy clear-and-replot versus reused artists
+    data = synthetic_universe(n_tickers, years)
+    color_map = DataHandler.color_map(list(data))
+    last = next(iter(data.values())).index[-1]
+    ranges = [((last - pd.DateOffset(years=years - k)).strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d'))
+              for k in range(frames)]
+
+    fig = plt.Figure(); fig.subplots_adjust(left=0.3)
+    ax = fig.add_subplot(111)
+    canvas = FigureCanvasAgg(fig)
+    t0 = time.perf_counter()
+    for start, end in ranges:
+        ax.clear()
+        for t, df in data.items():
+            sl = df.loc[start:end]
+            ax.plot(sl.index, sl[metric], label=t, color=color_map[t])
+        ax.set_title(metric)
+        ax.legend(loc='center right', bbox_to_anchor=(-0.2, 0.5))
+        canvas.draw()
+    legacy = (time.perf_counter() - t0) / frames
+
+    series = {t: TickerSeries(df) for t, df in data.items()}
+    chart = MetricChart(metric)
+    canvas = FigureCanvasAgg(chart.fig)
+    chart.render(series, color_map, {t: s.bounds(*ranges[0]) for t, s in series.items()})
+    canvas.draw()
+    t0 = time.perf_counter()
+    for start, end in ranges:
+        chart.render(series, color_map, {t: s.bounds(start, end) for t, s in series.items()})
+        canvas.draw()
+    reuse = (time.perf_counter() - t0) / frames
+    return {'legacy': legacy, 'reuse': reuse}
+
+
+def bench_update(n_tickers, years, spec='SMA=5,20,50,200;EMA=12,26', frames=5):
+    # What PlotManager.update costs minus Tk: compute the selected indicator windows, then
+    # render and draw every metric chart on the Agg backend. The first pass computes the
+    # windows ("cold"); later passes are range changes over memoized series ("warm")
+    data = synthetic_universe(n_tickers, years)
+    windows = parse_indicator_spec(spec)
+    color_map = DataHandler.color_map(list(data))
+    series = {t: TickerSeries(df) for t, df in data.items()}
+    charts = [MetricChart(m) for m in METRICS]
+    canvases = [FigureCanvasAgg(c.fig) for c in charts]
+    last = next(iter(data.values())).index[-1]
+
+    def update(start):
+        for s in series.values():
+            for name, ws in windows.items():
+                s.indicator(name, ws)
+        bounds = {t: s.bounds(start, last) for t, s in series.items()}
+        for chart, canvas in zip(charts, canvases):
+            chart.render(series, color_map, bounds, windows)
+            canvas.draw()
+
+    t0 = time.perf_counter()
+    update(last - pd.DateOffset(years=years))
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for k in range(1, frames + 1):
+        update(last - pd.DateOffset(years=max(1, years - k)))
+    return {'cold': cold, 'warm': (time.perf_counter() - t0) / frames}
+
+
+def bench_export(n_tickers, years):
+    # Time each on_export format over the full range and note the file size: DataExporter
+    # for the data formats (NPZ aligning its own panel, as the GUI does), savefig of a
+    # rendered chart for PNG and PDF, and the full-resolution WebGL dashboard for HTML
+    # (skipped without plotly)
+    data = synthetic_universe(n_tickers, years)
+    start, end = '1900-01-01', '2100-01-01'
+    out = tempfile.mkdtemp()
+    results, sizes = {}, {}
+
+    def timed(fmt, write):
+        path = os.path.join(out, f"export.{EXPORT_EXTENSIONS[fmt]}")
+        t0 = time.perf_counter()
+        write(path)
+        results[fmt] = time.perf_counter() - t0
+        sizes[fmt] = os.path.getsize(path) / 2 ** 20
+
+    for fmt in DATA_FORMATS:
+        timed(fmt, lambda path: DataExporter(data, start, end).write(fmt, path))
+    series = {t: TickerSeries(df) for t, df in data.items()}
+    bounds = {t: s.bounds(start, end) for t, s in series.items()}
+    color_map = DataHandler.color_map(list(data))
+    chart = MetricChart('Close')
+    FigureCanvasAgg(chart.fig)
+    chart.render(series, color_map, bounds)
+    for fmt in ('PNG', 'PDF'):
+        timed(fmt, chart.fig.savefig)
+    try:
+        timed('HTML', HtmlDashboard(series, bounds, DEFAULT_WINDOWS, color_map).write)
+    except RuntimeError as e:
+        print(f"export HTML skipped: {e}")
+    return results, sizes
+
+
+def bench_live(n_tickers, ticks, checkpoints=5, trace=False):
+    # Per-tick time (or, with trace, live Python memory) across a long replayed session
+    # should stay flat; tracing slows every tick, so time and memory are measured separately
+    names = [f"L{i:02d}" for i in range(n_tickers)]
+    replay = ReplayProvider({t: synthetic_minutes(t, days=max(1, ticks // 390 + 1)) for t in names})
+    feed = LiveFeed(names, DataHandler(store=HistoryStore(tempfile.mkdtemp()), provider=replay, workers=1))
+    replay.step(390)
+    feed.poll()
+    if trace:
+        tracemalloc.start()
+    every = max(1, ticks // checkpoints)
+    samples, t0 = [], time.perf_counter()
+    for k in range(1, ticks + 1):
+        replay.step()
+        feed.poll()
+        if k % every == 0:
+            elapsed = time.perf_counter() - t0
+            if trace:
+                gc.collect()
+                samples.append({'tick': k, 'traced_kb': tracemalloc.get_traced_memory()[0] / 1024})
+            else:
+                samples.append({'tick': k, 'ms_per_tick': elapsed / every * 1000})
+            t0 = time.perf_counter()
+    if trace:
+        tracemalloc.stop()
+    return samples
+
+
+def bench_panel(n_tickers, years):
+    # Indicator time for a universe: one pandas pipeline per ticker versus one panel pass
+    frames = {f"U{i:04d}": synthetic_ohlcv(f"U{i:04d}", years) for i in range(n_tickers)}
+    t0 = time.perf_counter()
+    for df in frames.values():
+        IndicatorEngine.compute(df.copy())
+    per_ticker = time.perf_counter() - t0
+    panel = Panel.from_frames(frames)
+    t0 = time.perf_counter()
+    panel.compute_indicators()
+    return {'per-ticker': per_ticker, 'panel': time.perf_counter() - t0}
+
+
+def flatten(results):
+    # {'section.label': value} for every number in a results tree
+    flat = {}
+    for section, values in results.items():
+        if isinstance(values, dict):
+            for label, value in values.items():
+                flat[f"{section}.{label}"] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    # Names of measurements that got slower (or bigger) than the baseline by more than tolerance
+    old = flatten(baseline['results'])
+    return [(key, old[key], value) for key, value in flatten(results).items()
+            if key in old and old[key] > 0 and value > old[key] * (1 + tolerance)]
+
+
+def run(args):
+    # Run every scenario, printing as it goes, and return the results tree
+    names = [f"T{i:03d}" for i in range(args.tickers)]
+    results = {}
+    results['fetch'] = bench_fetch(names, args.latency, args.errors)
+    for label, secs in results['fetch'].items():
+        print(f"fetch {label:<10} {secs:8.3f}s")
+    results['indicators'] = bench_panel(args.universe, 10)
+    for label, secs in results['indicators'].items():
+        print(f"indicators {label:<10} {secs:8.3f}s")
+    results['render'] = bench_render(args.tickers, args.years)
+    for label, secs in results['render'].items():
+        print(f"frame {label:<10} {secs * 1000:8.1f}ms")
+    results['update'] = bench_update(args.tickers, args.years)
+    for label, secs in results['update'].items():
+        print(f"update {label:<10} {secs * 1000:8.1f}ms")
+    results['export'], results['export_mb'] = bench_export(args.tickers, args.years)
+    for label, secs in results['export'].items():
+        print(f"export {label:<10} {secs:8.3f}s {results['export_mb'][label]:8.2f}MB")
+    samples = bench_live(5, 5000)
+    for sample in samples:
+        print(f"live tick {sample['tick']:>6} {sample['ms_per_tick']:7.2f}ms")
+    traced = bench_live(5, 1500, trace=True)
+    for sample in traced:
+        print(f"live tick {sample['tick']:>6} {sample['traced_kb']:7.0f}KB traced")
+    results['live'] = {'ms_per_tick': samples[-1]['ms_per_tick'], 'traced_kb': traced[-1]['traced_kb']}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline offline")
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--years', type=int, default=25)
+    parser.add_argument('--universe', type=int, default=500)
+    parser.add_argument('--errors', type=float, default=0.1, help="fraction of provider calls that fail")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="results file from an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+    results = run(args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'when': datetime.now().isoformat(timespec='seconds'), 'args': vars(args),
+                       'python': platform.python_version(), 'numpy': np.__version__,
+                       'pandas': pd.__version__, 'results': results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for key, old, new in regressions:
+            print(f"REGRESSION {key}: {old:.4g} -> {new:.4g}")
+        sys.exit(1 if regressions else 0)